@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from books.models import Book
+from books.models import Book, BookAvailability
 
 
 admin.site.register(Book)
+admin.site.register(BookAvailability)
@@ -1,6 +1,23 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def reinstall_search_index(using, **kwargs):
+    """Restore search triggers lost when a migration rebuilt books_book"""
+    from django.db import connections
+
+    from books.search import SEARCH_INDEX_TABLE, install_search_index
+
+    connection = connections[using]
+    if SEARCH_INDEX_TABLE in connection.introspection.table_names():
+        install_search_index(connection)
 
 
 class BooksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "books"
+
+    def ready(self):
+        import books.signals  # noqa: F401
+
+        post_migrate.connect(reinstall_search_index, sender=self)
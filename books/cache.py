@@ -0,0 +1,127 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+
+from library_service.db_router import use_primary
+
+
+CATALOG_VERSION_KEY = "books:catalog_version"
+CATALOG_STATS_KEY = "books:catalog_cache:{}"
+CATALOG_STATS = ("hits", "misses", "not_modified")
+RESPONSE_CACHE_TIMEOUT = 60 * 60
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses old keys
+        cache.add(CATALOG_VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+
+    return version
+
+
+def bump_catalog_version():
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        get_catalog_version()
+        return cache.incr(CATALOG_VERSION_KEY)
+
+
+def invalidate_catalog():
+    # Bump now for this connection's own reads and again after commit for
+    # readers that cached the pre-commit state in between
+    bump_catalog_version()
+    transaction.on_commit(bump_catalog_version)
+
+
+def record_stat(name):
+    key = CATALOG_STATS_KEY.format(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def get_cache_stats():
+    stats = cache.get_many(
+        [CATALOG_STATS_KEY.format(s) for s in CATALOG_STATS]
+    )
+
+    return {
+        name: stats.get(CATALOG_STATS_KEY.format(name), 0)
+        for name in CATALOG_STATS
+    }
+
+
+def get_response_cache_key(request):
+    variant = f"{request.accepted_media_type}|{request.build_absolute_uri()}"
+    digest = hashlib.md5(variant.encode()).hexdigest()
+
+    return f"books:response:{get_catalog_version()}:{digest}"
+
+
+class CatalogCacheMixin:
+    """Serve ``list`` and ``retrieve`` from a cache keyed on the catalog
+    version, answering matching ``If-None-Match`` requests with 304.
+    """
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.accepted_renderer.format != "json":
+            return handler(request, *args, **kwargs)
+
+        key = get_response_cache_key(request)
+        cached = cache.get(key)
+
+        if cached is None:
+            record_stat("misses")
+            # A lagging replica would store a stale page under the new
+            # catalog version for the whole timeout
+            with use_primary():
+                response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+            content = request.accepted_renderer.render(
+                response.data,
+                request.accepted_media_type,
+                self.get_renderer_context(),
+            )
+            etag = quote_etag(hashlib.md5(content).hexdigest())
+            content_type = request.accepted_media_type
+            if request.accepted_renderer.charset:
+                content_type += (
+                    f"; charset={request.accepted_renderer.charset}"
+                )
+            cached = (content, content_type, etag)
+            cache.set(key, cached, RESPONSE_CACHE_TIMEOUT)
+        else:
+            record_stat("hits")
+
+        content, content_type, etag = cached
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            record_stat("not_modified")
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type=content_type)
+
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+        patch_vary_headers(response, ["Accept"])
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
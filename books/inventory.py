@@ -0,0 +1,70 @@
+from django.db.models import F
+
+from books.cache import invalidate_catalog
+from books.models import Book
+
+
+def reserve_copy(book_id):
+    """Take one copy of a book off the shelf.
+
+    Runs a single conditional ``UPDATE ... WHERE inventory > 0`` so
+    concurrent borrowers can neither lose updates nor drive the inventory
+    below zero. Returns ``True`` if a copy was reserved.
+    """
+    reserved = Book.objects.filter(pk=book_id, inventory__gt=0).update(
+        inventory=F("inventory") - 1
+    )
+
+    if reserved:
+        invalidate_catalog()
+
+    return bool(reserved)
+
+
+def reserve_copies(counts):
+    """Take copies of several books off the shelf, all or nothing.
+
+    ``counts`` maps book ids to copies. Books are updated in id order so
+    concurrent carts lock rows in the same order. Returns the id of the
+    first book short of copies, or ``None``; callers roll back their
+    transaction on a shortfall.
+    """
+    for book_id, count in sorted(counts.items()):
+        if not Book.objects.filter(pk=book_id, inventory__gte=count).update(
+            inventory=F("inventory") - count
+        ):
+            return book_id
+
+    if counts:
+        invalidate_catalog()
+
+    return None
+
+
+def release_copy(book_id):
+    """Put one copy of a book back on the shelf"""
+    released = Book.objects.filter(pk=book_id).update(
+        inventory=F("inventory") + 1
+    )
+
+    if released:
+        invalidate_catalog()
+
+    return bool(released)
+
+
+def release_copies(counts):
+    """Put copies back on the shelf; ``counts`` maps book ids to copies.
+
+    Runs one ``UPDATE`` per book and invalidates the catalog once.
+    """
+    released = 0
+    for book_id, count in counts.items():
+        released += Book.objects.filter(pk=book_id).update(
+            inventory=F("inventory") + count
+        )
+
+    if released:
+        invalidate_catalog()
+
+    return released
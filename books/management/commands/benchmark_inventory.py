@@ -0,0 +1,106 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections, OperationalError
+
+from books.inventory import reserve_copy
+from books.models import Book
+
+
+def naive_reserve_copy(book_id):
+    """The former read-modify-write borrow path, kept for comparison"""
+    book = Book.objects.get(pk=book_id)
+
+    if book.inventory > 0:
+        book.inventory -= 1
+        book.save(update_fields=["inventory"])
+        return True
+
+    return False
+
+
+class Command(BaseCommand):
+    help = "Benchmark many concurrent borrowers reserving one title"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--borrowers", type=int, default=50)
+        parser.add_argument("--attempts", type=int, default=20)
+        parser.add_argument(
+            "--copies",
+            type=int,
+            help="Initial inventory (defaults to half of all attempts)",
+        )
+        parser.add_argument(
+            "--naive",
+            action="store_true",
+            help="Also run the read-modify-write path for comparison",
+        )
+
+    def handle(self, *args, **options):
+        borrowers = options["borrowers"]
+        attempts = options["attempts"]
+        copies = options["copies"] or borrowers * attempts // 2
+
+        self.run(reserve_copy, "atomic", borrowers, attempts, copies)
+        if options["naive"]:
+            self.run(naive_reserve_copy, "naive", borrowers, attempts, copies)
+
+    def run(self, reserve, label, borrowers, attempts, copies):
+        book = Book.objects.create(
+            title=f"Benchmark book ({label})",
+            author="Benchmark",
+            cover=Book.CoverChoices.SOFT,
+            inventory=copies,
+            dayle_fee=1,
+        )
+        barrier = threading.Barrier(borrowers)
+        lock = threading.Lock()
+        totals = {"reserved": 0, "rejected": 0, "errors": 0}
+
+        def borrower():
+            counts = {"reserved": 0, "rejected": 0, "errors": 0}
+            barrier.wait()
+            try:
+                for _ in range(attempts):
+                    try:
+                        result = reserve(book.id)
+                    except OperationalError:
+                        counts["errors"] += 1
+                    else:
+                        counts["reserved" if result else "rejected"] += 1
+            finally:
+                connections.close_all()
+            with lock:
+                for key, value in counts.items():
+                    totals[key] += value
+
+        threads = [threading.Thread(target=borrower) for _ in range(borrowers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        book.refresh_from_db()
+        expected = copies - totals["reserved"]
+        lost_updates = book.inventory - expected
+        book.delete()
+
+        operations = borrowers * attempts
+        self.stdout.write(
+            f"[{label}] {borrowers} borrowers x {attempts} attempts, "
+            f"{copies} copies: reserved={totals['reserved']} "
+            f"rejected={totals['rejected']} errors={totals['errors']} "
+            f"final_inventory={book.inventory} expected={expected} "
+            f"lost_updates={lost_updates} "
+            f"throughput={operations / elapsed:.0f} ops/s"
+        )
+
+        if lost_updates:
+            self.stdout.write(
+                self.style.ERROR(f"[{label}] {lost_updates} updates lost")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS(f"[{label}] no lost updates"))
@@ -0,0 +1,55 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books.importer import import_books, IMPORT_CHUNK_SIZE, ROW_READERS
+
+
+class Command(BaseCommand):
+    help = "Stream books from a CSV or JSONL file into the catalog"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin")
+        parser.add_argument(
+            "--format",
+            choices=list(ROW_READERS),
+            help="Input format (guessed from the file extension by default)",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=IMPORT_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"]
+
+        if file_format is None:
+            file_format = (
+                "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+            )
+
+        if path == "-":
+            result = import_books(
+                sys.stdin, file_format, options["chunk_size"]
+            )
+        else:
+            try:
+                with open(path, encoding="utf-8", newline="") as lines:
+                    result = import_books(
+                        lines, file_format, options["chunk_size"]
+                    )
+            except OSError as error:
+                raise CommandError(error)
+
+        for error in result["errors"]:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result['rows']} rows in {result['seconds']}s "
+                f"({result['rows_per_second']} rows/s): "
+                f"{result['created']} created, {result['updated']} updated, "
+                f"{result['unchanged']} unchanged, "
+                f"{result['invalid']} invalid"
+            )
+        )
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS books_book_fts USING fts5("
+        "title, author, content='books_book', content_rowid='id')"
+    )
+    schema_editor.execute(
+        "CREATE TRIGGER IF NOT EXISTS books_book_fts_ai "
+        "AFTER INSERT ON books_book BEGIN "
+        "INSERT INTO books_book_fts(rowid, title, author) "
+        "VALUES (new.id, new.title, new.author); END"
+    )
+    schema_editor.execute(
+        "CREATE TRIGGER IF NOT EXISTS books_book_fts_ad "
+        "AFTER DELETE ON books_book BEGIN "
+        "INSERT INTO books_book_fts(books_book_fts, rowid, title, author) "
+        "VALUES ('delete', old.id, old.title, old.author); END"
+    )
+    schema_editor.execute(
+        "CREATE TRIGGER IF NOT EXISTS books_book_fts_au "
+        "AFTER UPDATE OF title, author ON books_book BEGIN "
+        "INSERT INTO books_book_fts(books_book_fts, rowid, title, author) "
+        "VALUES ('delete', old.id, old.title, old.author); "
+        "INSERT INTO books_book_fts(rowid, title, author) "
+        "VALUES (new.id, new.title, new.author); END"
+    )
+    schema_editor.execute(
+        "INSERT INTO books_book_fts(books_book_fts) VALUES ('rebuild')"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    for trigger in ("ai", "ad", "au"):
+        schema_editor.execute(
+            f"DROP TRIGGER IF EXISTS books_book_fts_{trigger}"
+        )
+    schema_editor.execute("DROP TABLE IF EXISTS books_book_fts")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books", "0003_alter_book_inventory"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
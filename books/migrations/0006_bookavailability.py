@@ -0,0 +1,53 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_availability(apps, schema_editor):
+    Borrowing = apps.get_model("borrowings", "Borrowing")
+    BookAvailability = apps.get_model("books", "BookAvailability")
+
+    active = (
+        Borrowing.objects.filter(actual_return_date=None)
+        .values("book_id")
+        .annotate(
+            copies_out=models.Count("id"),
+            next_return_date=models.Min("expected_return_date"),
+        )
+        .order_by()
+    )
+    BookAvailability.objects.bulk_create(
+        BookAvailability(**row) for row in active.iterator()
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books", "0005_book_natural_key_idx"),
+        ("borrowings", "0003_borrowing_expected_return_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookAvailability",
+            fields=[
+                (
+                    "book",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="availability",
+                        serialize=False,
+                        to="books.book",
+                    ),
+                ),
+                ("copies_out", models.PositiveIntegerField(default=0)),
+                ("next_return_date", models.DateField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name_plural": "book availability",
+            },
+        ),
+        migrations.RunPython(backfill_availability, migrations.RunPython.noop),
+    ]
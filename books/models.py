@@ -13,5 +13,32 @@ class Book(models.Model):
     inventory = models.PositiveIntegerField()
     dayle_fee = models.DecimalField(max_digits=8, decimal_places=2)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["title", "author", "cover"],
+                name="book_natural_key_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.title
+
+
+class BookAvailability(models.Model):
+    """Precomputed view of the copies currently out on loan"""
+
+    book = models.OneToOneField(
+        Book,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="availability",
+    )
+    copies_out = models.PositiveIntegerField(default=0)
+    next_return_date = models.DateField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "book availability"
+
+    def __str__(self):
+        return f"{self.book}: {self.copies_out} out"
@@ -0,0 +1,90 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from books.models import Book
+
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+SEARCH_INDEX_TABLE = "books_book_fts"
+
+SEARCH_INDEX_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_INDEX_TABLE} USING fts5("
+    "title, author, content='books_book', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_INDEX_TABLE}_ai "
+    "AFTER INSERT ON books_book BEGIN "
+    f"INSERT INTO {SEARCH_INDEX_TABLE}(rowid, title, author) "
+    "VALUES (new.id, new.title, new.author); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_INDEX_TABLE}_ad "
+    "AFTER DELETE ON books_book BEGIN "
+    f"INSERT INTO {SEARCH_INDEX_TABLE}"
+    f"({SEARCH_INDEX_TABLE}, rowid, title, author) "
+    "VALUES ('delete', old.id, old.title, old.author); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_INDEX_TABLE}_au "
+    "AFTER UPDATE OF title, author ON books_book BEGIN "
+    f"INSERT INTO {SEARCH_INDEX_TABLE}"
+    f"({SEARCH_INDEX_TABLE}, rowid, title, author) "
+    "VALUES ('delete', old.id, old.title, old.author); "
+    f"INSERT INTO {SEARCH_INDEX_TABLE}(rowid, title, author) "
+    "VALUES (new.id, new.title, new.author); END",
+)
+
+
+def install_search_index(using_connection=connection):
+    """Create the FTS5 table and the triggers that keep it in sync.
+
+    SQLite drops triggers together with their table, so this is re-run
+    after migrations that rebuild ``books_book``.
+    """
+    if using_connection.vendor != "sqlite":
+        return
+
+    with using_connection.cursor() as cursor:
+        for statement in SEARCH_INDEX_SQL:
+            cursor.execute(statement)
+
+
+def rebuild_search_index(using_connection=connection):
+    """Re-index every book from the ``books_book`` content table"""
+    if using_connection.vendor != "sqlite":
+        return
+
+    install_search_index(using_connection)
+    with using_connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_INDEX_TABLE}({SEARCH_INDEX_TABLE}) "
+            "VALUES ('rebuild')"
+        )
+
+
+def build_match_query(query):
+    """Turn free user input into a safe FTS5 prefix query"""
+    terms = re.findall(r"\w+", query)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_books(query, limit=DEFAULT_SEARCH_LIMIT):
+    """Return books matching ``query`` ordered by BM25 rank"""
+    match_query = build_match_query(query)
+    if not match_query:
+        return []
+
+    if connection.vendor != "sqlite":
+        terms = re.findall(r"\w+", query)
+        condition = Q()
+        for term in terms:
+            condition &= Q(title__icontains=term) | Q(author__icontains=term)
+        return list(Book.objects.filter(condition).order_by("id")[:limit])
+
+    return list(
+        Book.objects.raw(
+            "SELECT books_book.* FROM books_book_fts "
+            "JOIN books_book ON books_book.id = books_book_fts.rowid "
+            "WHERE books_book_fts MATCH %s "
+            "ORDER BY bm25(books_book_fts) LIMIT %s",
+            [match_query, limit],
+        )
+    )
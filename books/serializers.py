@@ -7,3 +7,31 @@ class BookSerializer(serializers.ModelSerializer):
     class Meta:
         model = Book
         fields = ("id", "title", "author", "cover", "inventory", "dayle_fee")
+
+
+class BookAvailabilitySerializer(serializers.ModelSerializer):
+    copies_out = serializers.SerializerMethodField()
+    next_return_date = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Book
+        fields = ("id", "inventory", "copies_out", "next_return_date")
+
+    def get_copies_out(self, book) -> int:
+        availability = getattr(book, "availability", None)
+        return availability.copies_out if availability else 0
+
+    def get_next_return_date(self, book) -> str | None:
+        availability = getattr(book, "availability", None)
+        if availability is None or availability.next_return_date is None:
+            return None
+        return availability.next_return_date.isoformat()
+
+
+class BookListSerializer(BookAvailabilitySerializer):
+    class Meta:
+        model = Book
+        fields = BookSerializer.Meta.fields + (
+            "copies_out",
+            "next_return_date",
+        )
@@ -0,0 +1,77 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.cache import get_cache_stats, get_catalog_version
+from books.models import Book
+from users.models import User
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.book = Book.objects.create(
+            title="Book 1", inventory=2, dayle_fee=2
+        )
+        self.list_url = reverse("books:book-list")
+        self.detail_url = reverse("books:book-detail", args=[self.book.id])
+
+    def test_repeated_request_served_from_cache(self):
+        first = self.client.get(self.list_url)
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(self.list_url)
+
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first["ETag"], second["ETag"])
+        self.assertEqual(get_cache_stats()["hits"], 1)
+        self.assertEqual(get_cache_stats()["misses"], 1)
+
+    def test_matching_etag_returns_not_modified_without_queries(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                self.detail_url, HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(get_cache_stats()["not_modified"], 1)
+
+    def test_book_change_invalidates_cache(self):
+        version = get_catalog_version()
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        self.book.inventory = 1
+        self.book.save()
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertGreater(get_catalog_version(), version)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["inventory"], 1)
+
+    def test_cache_stats_requires_staff(self):
+        url = reverse("books:book-cache-stats")
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_authenticate(
+            User.objects.create_user(
+                email="admin@example.com", password="testpass", is_staff=True
+            )
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(response.data), {"hits", "misses", "not_modified"}
+        )
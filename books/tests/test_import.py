@@ -0,0 +1,109 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.importer import import_books
+from books.models import Book
+from users.models import User
+
+
+CSV_DATA = (
+    "title,author,cover,inventory,dayle_fee\n"
+    "Dune,Frank Herbert,Hard,3,1.50\n"
+    '"War, and Peace",Leo Tolstoy,Soft,2,2.00\n'
+    "Broken,Nobody,Paper,1,1\n"
+)
+
+JSONL_DATA = (
+    '{"title": "Dune", "author": "Frank Herbert", "cover": "Hard", '
+    '"inventory": 7, "dayle_fee": "1.75"}\n'
+    "\n"
+    '{"title": "Emma", "author": "Jane Austen", "cover": "Soft", '
+    '"inventory": 1, "dayle_fee": "0.50"}\n'
+    "not json\n"
+)
+
+
+class ImportBooksTests(TestCase):
+    def test_import_csv(self):
+        result = import_books(StringIO(CSV_DATA), "csv", chunk_size=2)
+
+        self.assertEqual(result["rows"], 3)
+        self.assertEqual(result["created"], 2)
+        self.assertEqual(result["invalid"], 1)
+        self.assertEqual(result["errors"][0]["line"], 4)
+        self.assertIn("cover", result["errors"][0]["errors"])
+        self.assertTrue(Book.objects.filter(title="War, and Peace").exists())
+
+    def test_import_jsonl_upserts_on_natural_key(self):
+        import_books(StringIO(CSV_DATA), "csv")
+
+        result = import_books(StringIO(JSONL_DATA), "jsonl")
+
+        self.assertEqual(result["created"], 1)
+        self.assertEqual(result["updated"], 1)
+        self.assertEqual(result["invalid"], 1)
+        self.assertEqual(result["errors"][0]["line"], 4)
+        dune = Book.objects.get(title="Dune")
+        self.assertEqual(dune.inventory, 7)
+        self.assertEqual(str(dune.dayle_fee), "1.75")
+        self.assertEqual(Book.objects.count(), 3)
+
+    def test_import_command(self):
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".jsonl", delete=False
+        ) as file:
+            file.write(JSONL_DATA)
+        self.addCleanup(os.remove, file.name)
+
+        out = StringIO()
+        call_command("import_books", file.name, stdout=out, stderr=StringIO())
+
+        self.assertIn("2 created", out.getvalue())
+        self.assertIn("rows/s", out.getvalue())
+
+
+class BulkImportEndpointTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("books:book-bulk-import")
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(
+            User.objects.create_user(email="user@example.com", password="x")
+        )
+
+        response = self.client.post(
+            self.url, CSV_DATA, content_type="text/csv"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_import(self):
+        self.client.force_authenticate(
+            User.objects.create_user(
+                email="admin@example.com", password="x", is_staff=True
+            )
+        )
+
+        response = self.client.post(
+            self.url, CSV_DATA, content_type="text/csv"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["invalid"], 1)
+
+        response = self.client.post(
+            self.url, CSV_DATA, content_type="application/json"
+        )
+
+        self.assertEqual(
+            response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        )
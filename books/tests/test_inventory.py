@@ -0,0 +1,39 @@
+from django.test import TestCase
+
+from books.cache import get_catalog_version
+from books.inventory import reserve_copy, release_copy
+from books.models import Book
+
+
+class InventoryReservationTests(TestCase):
+    def setUp(self):
+        self.book = Book.objects.create(
+            title="Book 1", inventory=2, dayle_fee=2
+        )
+
+    def test_reserve_until_sold_out(self):
+        self.assertTrue(reserve_copy(self.book.id))
+        self.assertTrue(reserve_copy(self.book.id))
+        self.assertFalse(reserve_copy(self.book.id))
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+
+    def test_release_returns_copy(self):
+        reserve_copy(self.book.id)
+
+        self.assertTrue(release_copy(self.book.id))
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 2)
+
+    def test_reservation_invalidates_catalog_cache(self):
+        version = get_catalog_version()
+
+        reserve_copy(self.book.id)
+
+        self.assertGreater(get_catalog_version(), version)
+
+    def test_unknown_book(self):
+        self.assertFalse(reserve_copy(0))
+        self.assertFalse(release_copy(0))
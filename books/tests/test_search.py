@@ -0,0 +1,79 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.models import Book
+from books.search import build_match_query, search_books
+
+
+class BuildMatchQueryTests(TestCase):
+    def test_terms_are_quoted_prefixes(self):
+        self.assertEqual(build_match_query("war peace"), '"war"* "peace"*')
+
+    def test_fts_syntax_is_stripped(self):
+        self.assertEqual(build_match_query('"AND (NOT*'), '"AND"* "NOT"*')
+        self.assertEqual(build_match_query("  -- "), "")
+
+
+class SearchBooksTests(TestCase):
+    def setUp(self):
+        self.war = Book.objects.create(
+            title="War and Peace",
+            author="Leo Tolstoy",
+            cover=Book.CoverChoices.HARD,
+            inventory=1,
+            dayle_fee=1,
+        )
+        self.anna = Book.objects.create(
+            title="Anna Karenina",
+            author="Leo Tolstoy",
+            cover=Book.CoverChoices.SOFT,
+            inventory=1,
+            dayle_fee=1,
+        )
+
+    def test_search_by_title_and_author(self):
+        self.assertEqual(search_books("peace"), [self.war])
+        self.assertCountEqual(search_books("tolstoy"), [self.war, self.anna])
+        self.assertEqual(search_books("anna tolst"), [self.anna])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.war.title = "Resurrection"
+        self.war.save()
+        self.assertEqual(search_books("peace"), [])
+        self.assertEqual(search_books("resurrection"), [self.war])
+
+        self.war.delete()
+        self.assertEqual(search_books("resurrection"), [])
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO books_book_fts(books_book_fts) "
+                "VALUES ('delete-all')"
+            )
+        self.assertEqual(search_books("peace"), [])
+
+        call_command("rebuild_book_index", stdout=StringIO())
+
+        self.assertEqual(search_books("peace"), [self.war])
+
+    def test_search_endpoint(self):
+        response = APIClient().get(
+            reverse("books:book-search"), {"q": "karenina"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["id"], self.anna.id)
+
+    def test_search_endpoint_without_query(self):
+        response = APIClient().get(reverse("books:book-search"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
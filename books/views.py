@@ -1,16 +1,176 @@
-from rest_framework import viewsets, permissions
+from django.db.models import prefetch_related_objects
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
+from books.cache import CatalogCacheMixin, get_cache_stats
+from books.importer import import_books
 from books.models import Book
-from books.serializers import BookSerializer
+from books.search import search_books, DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT
+from books.serializers import (
+    BookSerializer,
+    BookListSerializer,
+    BookAvailabilitySerializer,
+)
+from library_service.fastpath import ValuesListMixin
 
 
-class BookViewSet(viewsets.ModelViewSet):
-    queryset = Book.objects.all()
+MAX_AVAILABILITY_IDS = 100
+
+BULK_IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+}
+
+
+class BookViewSet(CatalogCacheMixin, ValuesListMixin, viewsets.ModelViewSet):
+    queryset = Book.objects.select_related("availability")
     serializer_class = BookSerializer
+    query_budgets = {
+        "list": 2,
+        "retrieve": 2,
+        "search": 3,
+        "availability": 2,
+    }
 
     def get_permissions(self):
-        if self.action in ["create", "update", "partial_update", "destroy"]:
+        if self.action in [
+            "create",
+            "update",
+            "partial_update",
+            "destroy",
+            "cache_stats",
+            "bulk_import",
+        ]:
             permission_classes = [permissions.IsAdminUser]
         else:
             permission_classes = [permissions.AllowAny]
         return [permission() for permission in permission_classes]
+
+    def get_values_overrides(self):
+        return {
+            "copies_out": (
+                ["availability__copies_out"],
+                lambda row: row["availability__copies_out"] or 0,
+            ),
+            "next_return_date": (
+                ["availability__next_return_date"],
+                lambda row: row["availability__next_return_date"]
+                and row["availability__next_return_date"].isoformat(),
+            ),
+        }
+
+    def get_serializer_class(self):
+        if self.action in ["list", "retrieve", "search"]:
+            return BookListSerializer
+
+        if self.action == "availability":
+            return BookAvailabilitySerializer
+
+        return BookSerializer
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                description="Search by title and author",
+                required=True,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="limit",
+                description="Max number of results",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False, url_path="search")
+    def search(self, request):
+        """Full-text search of books ranked by relevance"""
+        query = request.query_params.get("q", "")
+
+        try:
+            limit = int(
+                request.query_params.get("limit", DEFAULT_SEARCH_LIMIT)
+            )
+        except ValueError:
+            limit = DEFAULT_SEARCH_LIMIT
+        limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+
+        books = search_books(query, limit=limit)
+        prefetch_related_objects(books, "availability")
+        serializer = self.get_serializer(books, many=True)
+
+        return Response(serializer.data)
+
+    @action(methods=["GET"], detail=False, url_path="cache-stats")
+    def cache_stats(self, request):
+        """Hit and miss counters of the catalog response cache"""
+        return Response(get_cache_stats())
+
+    @extend_schema(
+        request={
+            "text/csv": OpenApiTypes.STR,
+            "application/x-ndjson": OpenApiTypes.STR,
+        },
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(methods=["POST"], detail=False, url_path="bulk")
+    def bulk_import(self, request):
+        """Upsert books streamed as CSV or JSONL in the request body"""
+        file_format = BULK_IMPORT_FORMATS.get(
+            request.content_type.split(";")[0]
+        )
+
+        if file_format is None:
+            return Response(
+                {
+                    "error": "Send the books as "
+                    f"{' or '.join(BULK_IMPORT_FORMATS)}."
+                },
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+
+        result = import_books(request.stream or [], file_format)
+
+        return Response(result, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="ids",
+                description="Comma-separated book IDs (ex. ?ids=1,2,3)",
+                required=True,
+                type=OpenApiTypes.STR,
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False, url_path="availability")
+    def availability(self, request):
+        """Copies out and next return date for a batch of books"""
+        try:
+            ids = {
+                int(book_id)
+                for book_id in request.query_params.get("ids", "").split(",")
+                if book_id
+            }
+        except ValueError:
+            return Response(
+                {"error": "ids must be comma-separated integers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if len(ids) > MAX_AVAILABILITY_IDS:
+            return Response(
+                {"error": f"At most {MAX_AVAILABILITY_IDS} ids are allowed."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        books = self.get_queryset().filter(id__in=ids).order_by("id")
+        serializer = self.get_serializer(books, many=True)
+
+        return Response(serializer.data)
@@ -0,0 +1,172 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import (
+    Count,
+    DecimalField,
+    F,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce, Greatest
+
+from borrowings.models import AccountSummary, Borrowing, Payment
+from users.models import User
+
+
+def update_account(user_id, **changes):
+    account = AccountSummary.objects.filter(pk=user_id)
+
+    if not account.update(**changes):
+        AccountSummary.objects.get_or_create(user_id=user_id)
+        account.update(**changes)
+
+
+def get_fine_change(payment):
+    if payment.type == Payment.TypeChoices.FINE:
+        return Value(payment.money_to_pay)
+
+    return Value(Decimal(0))
+
+
+def record_borrowing(borrowing):
+    record_borrowings({borrowing.user_id: 1})
+
+
+def record_borrowings(counts):
+    """Count ``counts`` new loans per user id"""
+    for user_id, count in counts.items():
+        update_account(
+            user_id, active_borrowings=F("active_borrowings") + count
+        )
+
+
+def record_borrowing_returned(borrowing):
+    record_borrowings_returned({borrowing.user_id: 1})
+
+
+def record_borrowings_returned(counts):
+    """Count ``counts`` returned loans per user id"""
+    for user_id, count in counts.items():
+        update_account(
+            user_id,
+            active_borrowings=Greatest(
+                F("active_borrowings") - count, Value(0)
+            ),
+        )
+
+
+def record_payment(payment):
+    """Count a new pending payment"""
+    record_payments([payment])
+
+
+def record_payments(payments):
+    """Count new pending payments with one update per user"""
+    totals = defaultdict(lambda: [0, Decimal(0)])
+    for payment in payments:
+        total = totals[payment.borrowing.user_id]
+        total[0] += 1
+        if payment.type == Payment.TypeChoices.FINE:
+            total[1] += payment.money_to_pay
+
+    for user_id, (count, fines) in totals.items():
+        update_account(
+            user_id,
+            pending_payments=F("pending_payments") + count,
+            outstanding_fines=F("outstanding_fines") + Value(fines),
+        )
+
+
+def record_payment_paid(payment):
+    update_account(
+        payment.borrowing.user_id,
+        pending_payments=Greatest(F("pending_payments") - 1, Value(0)),
+        outstanding_fines=Greatest(
+            F("outstanding_fines") - get_fine_change(payment),
+            Value(Decimal(0)),
+        ),
+    )
+
+
+def has_pending_payments(user_id):
+    """The borrow gate: a single primary-key lookup"""
+    return AccountSummary.objects.filter(
+        pk=user_id, pending_payments__gt=0
+    ).exists()
+
+
+def get_expected_accounts(user_ids=None):
+    """Account counters recomputed from borrowings and payments"""
+    pending = Payment.objects.filter(
+        borrowing__user=OuterRef("pk"), status=Payment.StatusChoices.PENDING
+    ).order_by()
+    active = Borrowing.objects.filter(
+        user=OuterRef("pk"), actual_return_date=None
+    ).order_by()
+    users = User.objects.all()
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+
+    return users.annotate(
+        pending_payments=Coalesce(
+            Subquery(
+                pending.values("borrowing__user")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        ),
+        outstanding_fines=Coalesce(
+            Subquery(
+                pending.filter(type=Payment.TypeChoices.FINE)
+                .values("borrowing__user")
+                .annotate(total=Sum("money_to_pay"))
+                .values("total")
+            ),
+            Value(Decimal(0)),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        ),
+        active_borrowings=Coalesce(
+            Subquery(
+                active.values("user")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        ),
+    ).values(
+        "id", "pending_payments", "active_borrowings", "outstanding_fines"
+    )
+
+
+def reconcile_accounts(user_ids=None):
+    """Rewrite account summaries that drifted from the source tables.
+
+    Returns how many summaries were created or corrected.
+    """
+    fields = ("pending_payments", "active_borrowings", "outstanding_fines")
+    expected = {row.pop("id"): row for row in get_expected_accounts(user_ids)}
+    current = AccountSummary.objects.in_bulk(list(expected))
+
+    to_create = []
+    to_update = []
+    for user_id, row in expected.items():
+        account = current.get(user_id)
+
+        if account is None:
+            if any(row.values()):
+                to_create.append(AccountSummary(user_id=user_id, **row))
+            continue
+
+        if any(getattr(account, field) != row[field] for field in fields):
+            for field in fields:
+                setattr(account, field, row[field])
+            to_update.append(account)
+
+    AccountSummary.objects.bulk_create(to_create)
+    AccountSummary.objects.bulk_update(to_update, fields)
+
+    return len(to_create) + len(to_update)
@@ -1,6 +1,25 @@
 from django.contrib import admin
 
-from borrowings.models import Borrowing, Payment
+from borrowings.models import (
+    AccountSummary,
+    ArchivedBorrowing,
+    ArchivedPayment,
+    Borrowing,
+    DailyBookStats,
+    Payment,
+    OutboxMessage,
+    OverdueScan,
+    OverdueScanPartition,
+    RollupState,
+)
 
 admin.site.register(Borrowing)
 admin.site.register(Payment)
+admin.site.register(OutboxMessage)
+admin.site.register(OverdueScan)
+admin.site.register(OverdueScanPartition)
+admin.site.register(AccountSummary)
+admin.site.register(DailyBookStats)
+admin.site.register(RollupState)
+admin.site.register(ArchivedBorrowing)
+admin.site.register(ArchivedPayment)
@@ -0,0 +1,176 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import BooleanField, Exists, OuterRef, Q, Value
+from django.utils import timezone
+
+from borrowings.models import (
+    ArchivedBorrowing,
+    ArchivedPayment,
+    Borrowing,
+    Payment,
+)
+from borrowings.rollups import get_day_bounds, get_next_rollup_day
+
+
+BORROWING_FIELDS = (
+    "id",
+    "borrow_date",
+    "expected_return_date",
+    "actual_return_date",
+    "book_id",
+    "user_id",
+)
+PAYMENT_FIELDS = (
+    "id",
+    "status",
+    "type",
+    "borrowing_id",
+    "session_url",
+    "session_id",
+    "money_to_pay",
+    "paid_at",
+)
+
+HISTORY_FIELDS = (
+    "id",
+    "borrow_date",
+    "expected_return_date",
+    "actual_return_date",
+    "book",
+    "book__title",
+    "user",
+    "user__email",
+)
+HISTORY_PAYMENT_FIELDS = (
+    "id",
+    "borrowing",
+    "status",
+    "type",
+    "money_to_pay",
+    "paid_at",
+)
+
+
+def get_archive_cutoff(after_days=None):
+    """First day whose returns stay in the hot table, or ``None`` if
+    there is nothing to archive.
+
+    Never later than the first day not yet rolled up, so rows are
+    summarized into ``DailyBookStats`` before they leave.
+    """
+    if after_days is None:
+        after_days = settings.ARCHIVE["AFTER_DAYS"]
+
+    next_rollup_day = get_next_rollup_day()
+    if next_rollup_day is None:
+        return None
+
+    return min(
+        timezone.localdate() - timedelta(days=after_days), next_rollup_day
+    )
+
+
+def get_archivable(cutoff):
+    """Borrowings returned before ``cutoff`` with every payment settled
+    before it too"""
+    paid_since, _ = get_day_bounds(cutoff, cutoff)
+    unsettled = Payment.objects.filter(
+        Q(status=Payment.StatusChoices.PENDING) | Q(paid_at__gte=paid_since),
+        borrowing=OuterRef("pk"),
+    )
+
+    return Borrowing.objects.filter(
+        ~Exists(unsettled), actual_return_date__lt=cutoff
+    )
+
+
+@transaction.atomic
+def archive_chunk(cutoff, chunk_size):
+    """Move one chunk of archivable borrowings and their payments.
+
+    Rows are copied and deleted in the same transaction, so a crash
+    leaves them in exactly one place. Returns how many were moved.
+    """
+    ids = list(
+        get_archivable(cutoff)
+        .order_by("id")
+        .values_list("id", flat=True)[:chunk_size]
+    )
+    if not ids:
+        return 0
+
+    ArchivedBorrowing.objects.bulk_create(
+        ArchivedBorrowing(**row)
+        for row in Borrowing.objects.filter(id__in=ids).values(
+            *BORROWING_FIELDS
+        )
+    )
+    ArchivedPayment.objects.bulk_create(
+        ArchivedPayment(**row)
+        for row in Payment.objects.filter(borrowing_id__in=ids).values(
+            *PAYMENT_FIELDS
+        )
+    )
+    Payment.objects.filter(borrowing_id__in=ids).delete()
+    Borrowing.objects.filter(id__in=ids).delete()
+
+    return len(ids)
+
+
+def archive_borrowings(after_days=None, chunk_size=None):
+    """Scheduled job moving old settled borrowings to the archive tables.
+
+    Each chunk is its own short transaction, so the borrow path never
+    waits long on the archiver. Returns the number of borrowings moved.
+    """
+    cutoff = get_archive_cutoff(after_days)
+    if cutoff is None:
+        return 0
+
+    chunk_size = chunk_size or settings.ARCHIVE["CHUNK_SIZE"]
+    archived = 0
+
+    while True:
+        moved = archive_chunk(cutoff, chunk_size)
+        archived += moved
+
+        if moved < chunk_size:
+            return archived
+
+
+def get_history_querysets(borrowings, archived_borrowings):
+    """Hot and archived borrowings as value rows of the same shape"""
+    return [
+        queryset.values(
+            *HISTORY_FIELDS,
+            archived=Value(archived, output_field=BooleanField()),
+        )
+        for queryset, archived in (
+            (borrowings, False),
+            (archived_borrowings, True),
+        )
+    ]
+
+
+def attach_history_payments(rows):
+    """Add each row's payments from the table it lives in; two queries"""
+    payments = {(row["archived"], row["id"]): [] for row in rows}
+
+    for archived, model in ((False, Payment), (True, ArchivedPayment)):
+        ids = [row["id"] for row in rows if row["archived"] is archived]
+        if not ids:
+            continue
+
+        for payment in (
+            model.objects.filter(borrowing_id__in=ids)
+            .order_by("id")
+            .values(*HISTORY_PAYMENT_FIELDS)
+        ):
+            payments[archived, payment["borrowing"]].append(payment)
+
+    for row in rows:
+        row["payments"] = payments[row["archived"], row["id"]]
+
+    return rows
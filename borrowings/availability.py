@@ -0,0 +1,59 @@
+from collections import Counter
+
+from django.db.models import F, Value, Subquery
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from books.models import BookAvailability
+from borrowings.models import Borrowing
+
+
+def record_borrow(borrowing):
+    """Count a new loan and pull the next free date forward if needed"""
+    record_borrows([borrowing])
+
+
+def record_borrows(borrowings):
+    """``record_borrow`` for many loans, with one update per book"""
+    counts = Counter(borrowing.book_id for borrowing in borrowings)
+    next_due = {}
+    for borrowing in borrowings:
+        due = next_due.get(borrowing.book_id, borrowing.expected_return_date)
+        next_due[borrowing.book_id] = min(due, borrowing.expected_return_date)
+
+    for book_id, count in counts.items():
+        availability = BookAvailability.objects.filter(pk=book_id)
+        expected = Value(next_due[book_id])
+        changes = {
+            "copies_out": F("copies_out") + count,
+            "next_return_date": Least(
+                Coalesce(F("next_return_date"), expected), expected
+            ),
+        }
+
+        if not availability.update(**changes):
+            BookAvailability.objects.get_or_create(book_id=book_id)
+            availability.update(**changes)
+
+
+def record_return(borrowing):
+    """Count a returned loan and recompute the next free date.
+
+    The earliest date among the book's remaining active borrowings is a
+    single lookup on the ``book`` foreign key index.
+    """
+    record_returns({borrowing.book_id: 1})
+
+
+def record_returns(counts):
+    """``record_return`` for ``counts`` loans per book id"""
+    for book_id, count in counts.items():
+        next_return = (
+            Borrowing.objects.filter(book_id=book_id, actual_return_date=None)
+            .order_by("expected_return_date")
+            .values("expected_return_date")[:1]
+        )
+
+        BookAvailability.objects.filter(pk=book_id).update(
+            copies_out=Greatest(F("copies_out") - count, Value(0)),
+            next_return_date=Subquery(next_return),
+        )
@@ -0,0 +1,77 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+BORROWING_EXPORT_FIELDS = (
+    "id",
+    "borrow_date",
+    "expected_return_date",
+    "actual_return_date",
+    "book_id",
+    "book__title",
+    "user_id",
+    "user__email",
+)
+PAYMENT_EXPORT_FIELDS = (
+    "id",
+    "status",
+    "type",
+    "borrowing_id",
+    "borrowing__user_id",
+    "session_url",
+    "session_id",
+    "money_to_pay",
+)
+
+
+class Echo:
+    """File-like object whose ``write`` hands the value back"""
+
+    def write(self, value):
+        return value
+
+
+def iter_ndjson(rows):
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+
+    for row in rows:
+        yield encoder.encode(row) + "\n"
+
+
+def iter_csv(rows, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+
+    for row in rows:
+        yield writer.writerow([row[field] for field in fields])
+
+
+def export_response(queryset, fields, file_format, filename):
+    """Stream ``queryset`` as NDJSON or CSV without materializing it"""
+    rows = (
+        queryset.order_by("id")
+        .values(*fields)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+    if file_format == "csv":
+        content = iter_csv(rows, fields)
+    else:
+        content = iter_ndjson(rows)
+
+    response = StreamingHttpResponse(
+        content, content_type=EXPORT_FORMATS[file_format]
+    )
+    response[
+        "Content-Disposition"
+    ] = f'attachment; filename="{filename}.{file_format}"'
+
+    return response
@@ -0,0 +1,255 @@
+import random
+import threading
+import time
+import uuid
+from functools import cache as memoize
+
+import stripe
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+
+GATEWAY_STATS_KEY = "payments:gateway:{}:{}"
+GATEWAY_STATS = ("calls", "errors", "rejected", "total_ms")
+SESSION_STATUS_KEY = "payments:session_status:{}"
+
+
+class GatewayError(Exception):
+    """The payment provider failed or timed out"""
+
+
+class GatewayUnavailable(GatewayError):
+    """The payment provider is failing; the call was not attempted"""
+
+
+def record_gateway_stat(operation, name, delta=1):
+    key = GATEWAY_STATS_KEY.format(operation, name)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key, delta)
+
+
+def get_gateway_stats(operations=("create_session", "retrieve_session")):
+    keys = [
+        GATEWAY_STATS_KEY.format(operation, name)
+        for operation in operations
+        for name in GATEWAY_STATS
+    ]
+    values = cache.get_many(keys)
+    stats = {}
+
+    for operation in operations:
+        row = {
+            name: values.get(GATEWAY_STATS_KEY.format(operation, name), 0)
+            for name in GATEWAY_STATS
+        }
+        calls = row["calls"]
+        row["avg_ms"] = round(row.pop("total_ms") / calls, 1) if calls else 0
+        stats[operation] = row
+
+    return stats
+
+
+class CircuitBreaker:
+    """Stop calling a failing dependency for ``reset_timeout`` seconds.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast with ``GatewayUnavailable``. Once the timeout passes a
+    single trial call is let through; its outcome closes or reopens it.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    def before_call(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+
+            retry_in = self.opened_at + self.reset_timeout - time.monotonic()
+            if retry_in > 0 or self.trial_running:
+                raise GatewayUnavailable("Payment provider circuit is open")
+
+            self.trial_running = True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class PaymentGateway:
+    """Checkout operations guarded by a circuit breaker and metered.
+
+    Subclasses implement ``_create_session`` and ``_retrieve_session``;
+    ``transient_errors`` count as provider failures and are raised as
+    ``GatewayError``. Other errors (bad requests) propagate untouched and
+    count as the provider being up.
+    """
+
+    transient_errors = ()
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, status_ttl=30):
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.status_ttl = status_ttl
+
+    def call(self, operation, func, *args, **kwargs):
+        try:
+            self.breaker.before_call()
+        except GatewayUnavailable:
+            record_gateway_stat(operation, "rejected")
+            raise
+
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except self.transient_errors as error:
+            self.breaker.record_failure()
+            record_gateway_stat(operation, "errors")
+            raise GatewayError(f"{operation} failed: {error}") from error
+        except Exception:
+            # The provider answered; a rejected request is not an outage
+            self.breaker.record_success()
+            raise
+        else:
+            self.breaker.record_success()
+            return result
+        finally:
+            elapsed_ms = round((time.perf_counter() - started) * 1000)
+            record_gateway_stat(operation, "calls")
+            record_gateway_stat(operation, "total_ms", elapsed_ms)
+
+    def create_session(self, line_items, success_url, cancel_url, key):
+        """Open a checkout session; returns ``(session id, url)``"""
+        return self.call(
+            "create_session",
+            self._create_session,
+            line_items,
+            success_url,
+            cancel_url,
+            key,
+        )
+
+    def get_session_status(self, session_id):
+        """Payment status of a session, cached for ``status_ttl`` seconds"""
+        key = SESSION_STATUS_KEY.format(session_id)
+        status = cache.get(key)
+
+        if status is None:
+            status = self.call(
+                "retrieve_session", self._retrieve_session, session_id
+            )
+            cache.set(key, status, self.status_ttl)
+
+        return status
+
+    def _create_session(self, line_items, success_url, cancel_url, key):
+        raise NotImplementedError
+
+    def _retrieve_session(self, session_id):
+        raise NotImplementedError
+
+
+class StripeGateway(PaymentGateway):
+    transient_errors = (
+        stripe.error.APIConnectionError,
+        stripe.error.APIError,
+        stripe.error.RateLimitError,
+    )
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.api_key = settings.STRIPE_SECRET_KEY
+        # stripe 5.x has no per-call client, so bound the shared one
+        stripe.default_http_client = stripe.http_client.RequestsClient(
+            timeout=settings.STRIPE_TIMEOUT
+        )
+        stripe.max_network_retries = settings.STRIPE_MAX_NETWORK_RETRIES
+
+    def _create_session(self, line_items, success_url, cancel_url, key):
+        session = stripe.checkout.Session.create(
+            api_key=self.api_key,
+            payment_method_types=["card"],
+            line_items=line_items,
+            mode="payment",
+            success_url=success_url,
+            cancel_url=cancel_url,
+            idempotency_key=key,
+        )
+
+        return session.id, session.url
+
+    def _retrieve_session(self, session_id):
+        session = stripe.checkout.Session.retrieve(
+            session_id, api_key=self.api_key
+        )
+
+        return session.payment_status
+
+
+class FakeGateway(PaymentGateway):
+    """In-memory gateway for load tests and local development.
+
+    Sessions are created instantly (or after ``latency`` seconds) and
+    report ``payment_status`` as their status; set ``failure_rate`` to
+    exercise the circuit breaker.
+    """
+
+    transient_errors = (ConnectionError,)
+
+    def __init__(
+        self, latency=0, payment_status="paid", failure_rate=0, **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.payment_status = payment_status
+        self.failure_rate = failure_rate
+        self.sessions = {}
+
+    def simulate(self):
+        if self.latency:
+            time.sleep(self.latency)
+        if random.random() < self.failure_rate:
+            raise ConnectionError("Simulated payment provider failure")
+
+    def _create_session(self, line_items, success_url, cancel_url, key):
+        self.simulate()
+        if key not in self.sessions:
+            session_id = f"cs_fake_{uuid.uuid4().hex}"
+            self.sessions[key] = (
+                session_id,
+                f"https://checkout.example.com/{session_id}",
+            )
+
+        return self.sessions[key]
+
+    def _retrieve_session(self, session_id):
+        self.simulate()
+        return self.payment_status
+
+
+@memoize
+def get_payment_gateway():
+    """The gateway configured in ``settings.PAYMENT_GATEWAY``"""
+    config = dict(settings.PAYMENT_GATEWAY)
+    gateway_class = import_string(config.pop("CLASS"))
+
+    return gateway_class(
+        **{key.lower(): value for key, value in config.items()}
+    )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from borrowings.archive import archive_borrowings
+
+
+class Command(BaseCommand):
+    help = "Move returned, fully paid borrowings to the archive tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Minimum age in days (settings.ARCHIVE['AFTER_DAYS'])",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="Borrowings per transaction (settings.ARCHIVE['CHUNK_SIZE'])",
+        )
+
+    def handle(self, *args, **options):
+        archived = archive_borrowings(options["days"], options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Archived borrowings: {archived}")
+        )
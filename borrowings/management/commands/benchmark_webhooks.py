@@ -0,0 +1,98 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from books.models import Book
+from borrowings.models import Borrowing, Payment, StripeEvent
+from borrowings.stripe_local import LocalStripe
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Replay checkout webhooks from a local Stripe stand-in"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--payments", type=int, default=1000)
+        parser.add_argument(
+            "--duplicates",
+            type=int,
+            default=1,
+            help="Extra deliveries of every event, as Stripe may retry",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.STRIPE_WEBHOOK_SECRET:
+            raise CommandError("Set STRIPE_WEBHOOK_SECRET first")
+
+        count = options["payments"]
+        deliveries = 1 + options["duplicates"]
+        stripe_local = LocalStripe()
+
+        user = User.objects.create_user(
+            email=f"benchmark-{time.time_ns()}@example.com"
+        )
+        book = Book.objects.create(
+            title="Benchmark book", inventory=0, dayle_fee=1
+        )
+        borrowings = Borrowing.objects.bulk_create(
+            Borrowing(
+                expected_return_date=timezone.localdate() + timedelta(days=1),
+                book=book,
+                user=user,
+            )
+            for _ in range(count)
+        )
+        payments = Payment.objects.bulk_create(
+            Payment(
+                borrowing=borrowing,
+                status=Payment.StatusChoices.PENDING,
+                type=Payment.TypeChoices.PAYMENT,
+                money_to_pay=1,
+                session_id=f"cs_bench_{borrowing.id}",
+            )
+            for borrowing in borrowings
+        )
+        events = [
+            stripe_local.checkout_completed(payment.session_id)
+            for payment in payments
+        ]
+
+        processed = 0
+        # Keep the "payment successful" alerts out of the real outbox, or
+        # drain_outbox would post them to the production chat
+        with mock.patch(
+            "borrowings.payment_service.queue_telegram_message"
+        ) as mock_notify:
+            started = time.perf_counter()
+            for _ in range(deliveries):
+                for event in events:
+                    response = stripe_local.deliver(event)
+                    processed += response.data["processed"]
+            elapsed = time.perf_counter() - started
+
+        paid = Payment.objects.filter(
+            borrowing__user=user, status=Payment.StatusChoices.PAID
+        ).count()
+        StripeEvent.objects.filter(id__in=[e["id"] for e in events]).delete()
+        user.delete()
+        book.delete()
+
+        self.stdout.write(
+            f"{count} payments x {deliveries} deliveries: "
+            f"processed={processed} paid={paid} "
+            f"notified={mock_notify.call_count} "
+            f"throughput={count * deliveries / elapsed:.0f} events/s"
+        )
+
+        if (
+            processed != count
+            or paid != count
+            or (mock_notify.call_count != count)
+        ):
+            self.stdout.write(self.style.ERROR("Events were not exactly-once"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Every payment paid once"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from borrowings.accounts import reconcile_accounts
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-user account summaries from borrowings and payments"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "user_ids",
+            nargs="*",
+            type=int,
+            help="Users to reconcile (all users by default)",
+        )
+
+    def handle(self, *args, **options):
+        fixed = reconcile_accounts(options["user_ids"] or None)
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled accounts: {fixed} corrected")
+        )
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("borrowings", "0002_payment"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                fields=["expected_return_date", "id"],
+                name="borrowing_expected_return_idx",
+            ),
+        ),
+    ]
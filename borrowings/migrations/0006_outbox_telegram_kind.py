@@ -0,0 +1,23 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("borrowings", "0005_outboxmessage"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="outboxmessage",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("Stripe session", "Stripe Session"),
+                    ("Telegram message", "Telegram Message"),
+                ],
+                max_length=50,
+            ),
+        ),
+    ]
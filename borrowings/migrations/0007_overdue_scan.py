@@ -0,0 +1,67 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("borrowings", "0006_outbox_telegram_kind"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OverdueScan",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("cutoff", models.DateField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="borrowing",
+            name="overdue_notified_for",
+            field=models.DateField(
+                blank=True,
+                help_text="Expected return date the last overdue alert was sent for",
+                null=True,
+            ),
+        ),
+        migrations.CreateModel(
+            name="OverdueScanPartition",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_id", models.PositiveBigIntegerField()),
+                ("end_id", models.PositiveBigIntegerField()),
+                ("checkpoint_id", models.PositiveBigIntegerField(default=0)),
+                ("rows", models.PositiveIntegerField(default=0)),
+                ("messages", models.PositiveIntegerField(default=0)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "scan",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="partitions",
+                        to="borrowings.overduescan",
+                    ),
+                ),
+            ],
+        ),
+    ]
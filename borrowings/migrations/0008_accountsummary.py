@@ -0,0 +1,81 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_accounts(apps, schema_editor):
+    Borrowing = apps.get_model("borrowings", "Borrowing")
+    Payment = apps.get_model("borrowings", "Payment")
+    AccountSummary = apps.get_model("borrowings", "AccountSummary")
+    accounts = {}
+
+    def get_account(user_id):
+        if user_id not in accounts:
+            accounts[user_id] = AccountSummary(user_id=user_id)
+        return accounts[user_id]
+
+    active = (
+        Borrowing.objects.filter(actual_return_date=None)
+        .values("user_id")
+        .annotate(count=models.Count("id"))
+        .order_by()
+    )
+    for row in active.iterator():
+        get_account(row["user_id"]).active_borrowings = row["count"]
+
+    pending = (
+        Payment.objects.filter(status="Pending")
+        .values("borrowing__user_id")
+        .annotate(
+            count=models.Count("id"),
+            fines=models.Sum(
+                "money_to_pay", filter=models.Q(type="Fine"), default=0
+            ),
+        )
+        .order_by()
+    )
+    for row in pending.iterator():
+        account = get_account(row["borrowing__user_id"])
+        account.pending_payments = row["count"]
+        account.outstanding_fines = row["fines"]
+
+    AccountSummary.objects.bulk_create(accounts.values())
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0001_initial"),
+        ("borrowings", "0007_overdue_scan"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AccountSummary",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="account",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("pending_payments", models.PositiveIntegerField(default=0)),
+                ("active_borrowings", models.PositiveIntegerField(default=0)),
+                (
+                    "outstanding_fines",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=10
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "account summaries",
+            },
+        ),
+        migrations.RunPython(backfill_accounts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books", "0006_bookavailability"),
+        ("borrowings", "0009_stripe_event"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyBookStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("borrows", models.PositiveIntegerField(default=0)),
+                ("returns", models.PositiveIntegerField(default=0)),
+                ("late_returns", models.PositiveIntegerField(default=0)),
+                (
+                    "fines_issued",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=12
+                    ),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=12
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "daily book stats",
+            },
+        ),
+        migrations.CreateModel(
+            name="RollupState",
+            fields=[
+                (
+                    "name",
+                    models.CharField(
+                        max_length=50, primary_key=True, serialize=False
+                    ),
+                ),
+                ("last_day", models.DateField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="payment",
+            name="paid_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                fields=["borrow_date"], name="borrowing_borrowed_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                condition=models.Q(("actual_return_date__isnull", False)),
+                fields=["actual_return_date"],
+                name="borrowing_returned_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                condition=models.Q(("paid_at__isnull", False)),
+                fields=["paid_at"],
+                name="payment_paid_at_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailybookstats",
+            name="book",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="daily_stats",
+                to="books.book",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailybookstats",
+            constraint=models.UniqueConstraint(
+                fields=("day", "book"), name="daily_book_stats_day_book"
+            ),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("books", "0006_bookavailability"),
+        ("borrowings", "0010_daily_book_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedBorrowing",
+            fields=[
+                (
+                    "id",
+                    models.BigIntegerField(primary_key=True, serialize=False),
+                ),
+                ("borrow_date", models.DateField()),
+                ("expected_return_date", models.DateField()),
+                ("actual_return_date", models.DateField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_borrowings",
+                        to="books.book",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_borrowings",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ArchivedPayment",
+            fields=[
+                (
+                    "id",
+                    models.BigIntegerField(primary_key=True, serialize=False),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("Pending", "Pending"), ("Paid", "Paid")],
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[("Payment", "Payment"), ("Fine", "Fine")],
+                        max_length=50,
+                    ),
+                ),
+                ("session_url", models.URLField(blank=True, null=True)),
+                (
+                    "session_id",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                (
+                    "money_to_pay",
+                    models.DecimalField(decimal_places=2, max_digits=8),
+                ),
+                ("paid_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "borrowing",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="payments",
+                        to="borrowings.archivedborrowing",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -1,9 +1,58 @@
 from django.db import models
+from django.db.models import Count, FilteredRelation, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 from books.models import Book
+from borrowings.pricing import (
+    ZERO,
+    fine_price_expression,
+    total_price_expression,
+)
 from users.models import User
 
 
+class BorrowingQuerySet(models.QuerySet):
+    def with_prices(self):
+        """Annotate ``price_amount`` and ``fine_amount`` computed in SQL"""
+        return self.annotate(
+            price_amount=total_price_expression(),
+            fine_amount=fine_price_expression(),
+        )
+
+    def with_fine_as_of(self, day):
+        """Annotate the ``fine_amount`` due if returned on ``day``"""
+        return self.annotate(fine_amount=fine_price_expression(day))
+
+    def fine_totals(self, day=None):
+        """Billed and accruing fines of the queryset in one query.
+
+        ``outstanding_fines`` sums unpaid fine payments; a borrowing has at
+        most one, so the join does not repeat rows. ``projected_fines``
+        prices active overdue borrowings as if returned on ``day``.
+        """
+        day = day or timezone.localdate()
+        overdue = Q(actual_return_date=None, expected_return_date__lt=day)
+
+        return self.annotate(
+            pending_fine=FilteredRelation(
+                "payments",
+                condition=Q(
+                    payments__type=Payment.TypeChoices.FINE,
+                    payments__status=Payment.StatusChoices.PENDING,
+                ),
+            )
+        ).aggregate(
+            outstanding_fines=Coalesce(
+                Sum("pending_fine__money_to_pay"), ZERO
+            ),
+            projected_fines=Coalesce(
+                Sum(fine_price_expression(day), filter=overdue), ZERO
+            ),
+            overdue_borrowings=Count("id", filter=overdue),
+        )
+
+
 class Borrowing(models.Model):
     borrow_date = models.DateField(auto_now_add=True)
     expected_return_date = models.DateField()
@@ -14,6 +63,42 @@ class Borrowing(models.Model):
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="borrowings"
     )
+    overdue_notified_for = models.DateField(
+        null=True,
+        blank=True,
+        help_text="Expected return date the last overdue alert was sent for",
+    )
+
+    objects = BorrowingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["expected_return_date", "id"],
+                name="borrowing_expected_return_idx",
+            ),
+            models.Index(
+                fields=["expected_return_date"],
+                condition=models.Q(actual_return_date=None),
+                name="borrowing_active_due_idx",
+            ),
+            models.Index(
+                fields=["user", "actual_return_date"],
+                name="borrowing_user_returned_idx",
+            ),
+            models.Index(
+                fields=["book", "actual_return_date", "expected_return_date"],
+                name="borrowing_book_active_idx",
+            ),
+            models.Index(
+                fields=["borrow_date"], name="borrowing_borrowed_idx"
+            ),
+            models.Index(
+                fields=["actual_return_date"],
+                condition=models.Q(actual_return_date__isnull=False),
+                name="borrowing_returned_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.email}: {self.book.title}"
@@ -50,6 +135,207 @@ class Payment(models.Model):
     session_url = models.URLField(null=True, blank=True)
     session_id = models.CharField(max_length=255, null=True, blank=True)
     money_to_pay = models.DecimalField(max_digits=8, decimal_places=2)
+    paid_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["borrowing", "status"],
+                name="payment_borrowing_status_idx",
+            ),
+            models.Index(fields=["session_id"], name="payment_session_idx"),
+            models.Index(
+                fields=["paid_at"],
+                condition=models.Q(paid_at__isnull=False),
+                name="payment_paid_at_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Payment #{self.id}"
+
+
+class AccountSummary(models.Model):
+    """Per-user counters kept in step with borrowings and payments.
+
+    Maintained by ``borrowings.accounts``; ``reconcile_accounts`` rebuilds
+    them from the source tables.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="account",
+    )
+    pending_payments = models.PositiveIntegerField(default=0)
+    active_borrowings = models.PositiveIntegerField(default=0)
+    outstanding_fines = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0
+    )
+
+    class Meta:
+        verbose_name_plural = "account summaries"
+
+    def __str__(self):
+        return f"Account of user #{self.user_id}"
+
+
+class StripeEvent(models.Model):
+    """Webhook event already handled, keyed by Stripe's event id"""
+
+    id = models.CharField(max_length=255, primary_key=True)
+    type = models.CharField(max_length=255)
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.type} {self.id}"
+
+
+class OutboxMessage(models.Model):
+    """Side effect recorded in the same transaction as its cause.
+
+    Messages are delivered after commit by ``borrowings.outbox``.
+    """
+
+    class KindChoices(models.TextChoices):
+        STRIPE_SESSION = "Stripe session"
+        TELEGRAM_MESSAGE = "Telegram message"
+
+    class StatusChoices(models.TextChoices):
+        PENDING = "Pending"
+        DONE = "Done"
+        DEAD = "Dead"
+
+    kind = models.CharField(max_length=50, choices=KindChoices.choices)
+    payload = models.JSONField()
+    status = models.CharField(
+        max_length=50,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDING,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["available_at"],
+                condition=models.Q(status="Pending"),
+                name="outbox_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} ({self.status})"
+
+
+class OverdueScan(models.Model):
+    """One run of the overdue detection, split into id-range partitions"""
+
+    cutoff = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Overdue scan #{self.id} ({self.cutoff})"
+
+
+class OverdueScanPartition(models.Model):
+    """Borrowing ids ``start_id..end_id`` of a scan and how far it got"""
+
+    scan = models.ForeignKey(
+        OverdueScan, on_delete=models.CASCADE, related_name="partitions"
+    )
+    start_id = models.PositiveBigIntegerField()
+    end_id = models.PositiveBigIntegerField()
+    checkpoint_id = models.PositiveBigIntegerField(default=0)
+    rows = models.PositiveIntegerField(default=0)
+    messages = models.PositiveIntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Borrowings {self.start_id}-{self.end_id}"
+
+
+class DailyBookStats(models.Model):
+    """Activity of one book on one day, rolled up by ``borrowings.rollups``"""
+
+    day = models.DateField()
+    book = models.ForeignKey(
+        Book, on_delete=models.CASCADE, related_name="daily_stats"
+    )
+    borrows = models.PositiveIntegerField(default=0)
+    returns = models.PositiveIntegerField(default=0)
+    late_returns = models.PositiveIntegerField(default=0)
+    fines_issued = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0
+    )
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = "daily book stats"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "book"], name="daily_book_stats_day_book"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Book #{self.book_id} on {self.day}"
+
+
+class RollupState(models.Model):
+    """High-water mark of a rollup: the last day it has summarized"""
+
+    name = models.CharField(max_length=50, primary_key=True)
+    last_day = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} up to {self.last_day}"
+
+
+class ArchivedBorrowing(models.Model):
+    """Returned, fully paid borrowing moved out of the hot table.
+
+    Keeps the original id; written by ``borrowings.archive``.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    borrow_date = models.DateField()
+    expected_return_date = models.DateField()
+    actual_return_date = models.DateField()
+    book = models.ForeignKey(
+        Book, on_delete=models.CASCADE, related_name="archived_borrowings"
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="archived_borrowings"
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived borrowing #{self.id}"
+
+
+class ArchivedPayment(models.Model):
+    """Payment of an ``ArchivedBorrowing``, with its original id"""
+
+    id = models.BigIntegerField(primary_key=True)
+    status = models.CharField(
+        max_length=50, choices=Payment.StatusChoices.choices
+    )
+    type = models.CharField(max_length=50, choices=Payment.TypeChoices.choices)
+    borrowing = models.ForeignKey(
+        ArchivedBorrowing, on_delete=models.CASCADE, related_name="payments"
+    )
+    session_url = models.URLField(null=True, blank=True)
+    session_id = models.CharField(max_length=255, null=True, blank=True)
+    money_to_pay = models.DecimalField(max_digits=8, decimal_places=2)
+    paid_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Archived payment #{self.id}"
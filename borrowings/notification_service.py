@@ -1,17 +1,18 @@
-import os
-
-import requests
-from dotenv import load_dotenv
+from borrowings.models import OutboxMessage
+from borrowings.outbox import enqueue
+from borrowings.telegram import get_telegram_client
 
 
 def send_telegram_message(message):
-    load_dotenv()
-    bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
-    chat_id = os.getenv("TELEGRAM_CHAT_ID")
-    api_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-    payload = {
-        "chat_id": chat_id,
-        "text": message,
-    }
-    response = requests.post(api_url, json=payload)
-    return response
+    return get_telegram_client().send(message)
+
+
+def queue_telegram_message(message):
+    """Send ``message`` from an outbox worker once the transaction commits"""
+    enqueue(OutboxMessage.KindChoices.TELEGRAM_MESSAGE, {"text": message})
+
+
+def deliver_telegram_message(payload):
+    """Outbox handler; raising makes the message retry later"""
+    response = send_telegram_message(payload["text"])
+    response.raise_for_status()
@@ -0,0 +1,112 @@
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from django_q.tasks import async_task
+
+from borrowings.models import OutboxMessage
+
+
+logger = logging.getLogger(__name__)
+
+DRAIN_BATCH_SIZE = 100
+MAX_ATTEMPTS = 8
+LEASE_TIMEOUT = timedelta(minutes=5)
+RETRY_BASE_DELAY = timedelta(seconds=15)
+
+HANDLERS = {
+    OutboxMessage.KindChoices.STRIPE_SESSION: (
+        "borrowings.payment_service.open_stripe_session"
+    ),
+    OutboxMessage.KindChoices.TELEGRAM_MESSAGE: (
+        "borrowings.notification_service.deliver_telegram_message"
+    ),
+}
+
+
+def schedule_drain():
+    async_task("borrowings.outbox.drain_outbox")
+
+
+def enqueue(kind, payload):
+    """Record a message in the current transaction.
+
+    A worker is woken up once the transaction commits; the periodic
+    ``drain_outbox`` schedule picks up anything that notification missed.
+    """
+    message = OutboxMessage.objects.create(kind=kind, payload=payload)
+    transaction.on_commit(schedule_drain, robust=True)
+
+    return message
+
+
+def claim(message):
+    """Lease ``message`` to this worker with a conditional UPDATE"""
+    now = timezone.now()
+
+    return OutboxMessage.objects.filter(
+        pk=message.pk,
+        status=OutboxMessage.StatusChoices.PENDING,
+        available_at=message.available_at,
+    ).update(available_at=now + LEASE_TIMEOUT, attempts=F("attempts") + 1)
+
+
+def deliver(message):
+    try:
+        import_string(HANDLERS[message.kind])(message.payload)
+    except Exception as error:
+        attempts = message.attempts + 1
+        dead = attempts >= MAX_ATTEMPTS
+        logger.warning(
+            "Outbox message #%s failed (attempt %s): %s",
+            message.id,
+            attempts,
+            error,
+        )
+        OutboxMessage.objects.filter(pk=message.pk).update(
+            status=(
+                OutboxMessage.StatusChoices.DEAD
+                if dead
+                else OutboxMessage.StatusChoices.PENDING
+            ),
+            available_at=timezone.now()
+            + RETRY_BASE_DELAY * 2 ** (attempts - 1),
+            last_error=repr(error),
+        )
+        return False
+
+    OutboxMessage.objects.filter(pk=message.pk).update(
+        status=OutboxMessage.StatusChoices.DONE,
+        processed_at=timezone.now(),
+        last_error="",
+    )
+    return True
+
+
+def drain_outbox(batch_size=DRAIN_BATCH_SIZE):
+    """Deliver due outbox messages; returns delivered and failed counts"""
+    delivered = failed = 0
+
+    while True:
+        messages = list(
+            OutboxMessage.objects.filter(
+                status=OutboxMessage.StatusChoices.PENDING,
+                available_at__lte=timezone.now(),
+            ).order_by("available_at")[:batch_size]
+        )
+        if not messages:
+            break
+
+        for message in messages:
+            if not claim(message):
+                continue
+
+            if deliver(message):
+                delivered += 1
+            else:
+                failed += 1
+
+    return {"delivered": delivered, "failed": failed}
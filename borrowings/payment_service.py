@@ -1,50 +1,116 @@
-import os
-
-import stripe
 from django.db import transaction
+from django.utils import timezone
 from rest_framework.reverse import reverse
 
-from borrowings.models import Payment
+from borrowings.accounts import record_payments, record_payment_paid
+from borrowings.gateway import get_payment_gateway
+from borrowings.models import Payment, OutboxMessage
+from borrowings.notification_service import queue_telegram_message
+from borrowings.outbox import enqueue
+
 
+def create_stripe_session(request, borrowing):
+    """Create a pending payment and queue its Stripe checkout session.
 
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+    The Stripe call happens in an outbox worker after commit, so the
+    borrow transaction never waits on the network. Clients poll the
+    payment until ``session_url`` is filled in.
+    """
+    return create_checkout(request, [borrowing])[0]
 
 
 @transaction.atomic
-def create_stripe_session(request, borrowing):
-    total_price = borrowing.total_price
-    unit_amount = int(total_price * 100)
-
-    payment = Payment.objects.create(
-        borrowing=borrowing,
-        status=Payment.StatusChoices.PENDING,
-        type=Payment.TypeChoices.PAYMENT,
-        money_to_pay=total_price,
+def create_checkout(request, borrowings):
+    """Create pending payments for ``borrowings`` sharing one session.
+
+    The queued checkout session carries a line item per borrowing, so a
+    cart costs a single Stripe call however many books it holds.
+    """
+    payments = Payment.objects.bulk_create(
+        Payment(
+            borrowing=borrowing,
+            status=Payment.StatusChoices.PENDING,
+            type=Payment.TypeChoices.PAYMENT,
+            money_to_pay=borrowing.total_price,
+        )
+        for borrowing in borrowings
     )
+    record_payments(payments)
 
-    session = stripe.checkout.Session.create(
-        payment_method_types=["card"],
+    payment = payments[0]
+    enqueue(
+        OutboxMessage.KindChoices.STRIPE_SESSION,
+        {
+            "payment_ids": [payment.pk for payment in payments],
+            "success_url": request.build_absolute_uri(
+                reverse(
+                    "borrowings:payment_success", kwargs={"pk": payment.pk}
+                )
+            ),
+            "cancel_url": request.build_absolute_uri(
+                reverse("borrowings:payment_cancel", kwargs={"pk": payment.pk})
+            ),
+        },
+    )
+
+    return payments
+
+
+def open_stripe_session(payload):
+    """Outbox handler creating the checkout session of queued payments"""
+    payment_ids = payload.get("payment_ids") or [payload["payment_id"]]
+    payments = list(
+        Payment.objects.select_related("borrowing__book")
+        .filter(pk__in=payment_ids)
+        .order_by("pk")
+    )
+
+    if not payments or payments[0].session_id:
+        return
+
+    session_id, session_url = get_payment_gateway().create_session(
         line_items=[
             {
                 "price_data": {
                     "currency": "usd",
-                    "unit_amount": unit_amount,
+                    "unit_amount": int(payment.money_to_pay * 100),
                     "product_data": {
-                        "name": borrowing.book.title,
+                        "name": payment.borrowing.book.title,
                     },
                 },
                 "quantity": 1,
             }
+            for payment in payments
         ],
-        mode="payment",
-        success_url=request.build_absolute_uri(
-            reverse("borrowings:payment_success", kwargs={"pk": payment.pk})
-        ),
-        cancel_url=request.build_absolute_uri(
-            reverse("borrowings:payment_cancel", kwargs={"pk": payment.pk})
-        ),
+        success_url=payload["success_url"],
+        cancel_url=payload["cancel_url"],
+        key=f"payment-session-{payments[0].pk}",
     )
 
-    payment.session_url = session.url
-    payment.session_id = session.id
-    payment.save()
+    Payment.objects.filter(pk__in=payment_ids).update(
+        session_url=session_url, session_id=session_id
+    )
+
+
+def confirm_payment(payment):
+    """Mark a pending ``payment`` paid exactly once.
+
+    Returns whether this call changed it. Expects ``borrowing__user`` and
+    ``borrowing__book`` to be loaded for the notification.
+    """
+    paid = Payment.objects.filter(
+        pk=payment.pk, status=Payment.StatusChoices.PENDING
+    ).update(status=Payment.StatusChoices.PAID, paid_at=timezone.now())
+
+    if paid:
+        payment.status = Payment.StatusChoices.PAID
+        record_payment_paid(payment)
+
+        message = (
+            f"Payment #{payment.id} was successful.\n"
+            f"Type: {payment.type}\n"
+            f"Borrowing: {payment.borrowing}"
+        )
+        queue_telegram_message(message)
+
+    return bool(paid)
@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+from django.db.models import (
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Func,
+    IntegerField,
+    Value,
+)
+from django.db.models.functions import Greatest
+
+
+FINE_MULTIPLIER = 2
+PRICE_FIELD = DecimalField(max_digits=10, decimal_places=2)
+ZERO = Value(Decimal(0), output_field=PRICE_FIELD)
+
+
+class DaysBetween(Func):
+    """Whole days from ``start`` to ``end``, computed by the database"""
+
+    arg_joiner = " - "
+    template = "(%(expressions)s)"
+    output_field = IntegerField()
+
+    def __init__(self, end, start, **extra):
+        super().__init__(end, start, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="CAST(julianday(%(expressions)s) AS INTEGER)",
+            arg_joiner=") - julianday(",
+            **extra_context,
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            function="DATEDIFF",
+            template="%(function)s(%(expressions)s)",
+            arg_joiner=", ",
+            **extra_context,
+        )
+
+
+def total_price_expression():
+    """SQL twin of ``Borrowing.total_price``"""
+    return ExpressionWrapper(
+        F("book__dayle_fee")
+        * DaysBetween(F("expected_return_date"), F("borrow_date")),
+        output_field=PRICE_FIELD,
+    )
+
+
+def fine_price_expression(returned_on=None):
+    """SQL twin of ``Borrowing.fine_price``, never below zero.
+
+    ``returned_on`` defaults to the actual return date; pass a date to
+    price an active borrowing as if it came back that day.
+    """
+    if returned_on is None:
+        returned_on = F("actual_return_date")
+    elif not hasattr(returned_on, "resolve_expression"):
+        returned_on = Value(returned_on)
+
+    late_days = Greatest(
+        DaysBetween(returned_on, F("expected_return_date")), Value(0)
+    )
+
+    return ExpressionWrapper(
+        F("book__dayle_fee") * late_days * Value(FINE_MULTIPLIER),
+        output_field=PRICE_FIELD,
+    )
@@ -0,0 +1,141 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from borrowings.models import (
+    Borrowing,
+    DailyBookStats,
+    Payment,
+    RollupState,
+)
+from library_service.db_router import use_replica
+
+
+DAILY_BOOK_STATS = "daily_book_stats"
+ROLLUP_BATCH_DAYS = 7
+
+
+def get_day_bounds(start, end):
+    """Aware datetimes covering the local days ``start..end``"""
+    tz = timezone.get_current_timezone()
+
+    return (
+        datetime.combine(start, time.min, tz),
+        datetime.combine(end + timedelta(days=1), time.min, tz),
+    )
+
+
+def collect_daily_book_stats(start, end):
+    """Aggregate the days ``start..end`` into unsaved ``DailyBookStats``.
+
+    Four grouped queries, each a range scan on an index: borrows by
+    ``borrow_date``, returns and fines by ``actual_return_date`` (fines
+    are issued the day a late book comes back) and revenue by
+    ``paid_at``.
+    """
+    stats = defaultdict(dict)
+    paid_from, paid_to = get_day_bounds(start, end)
+
+    for row in (
+        Borrowing.objects.filter(borrow_date__range=(start, end))
+        .values("borrow_date", "book_id")
+        .annotate(borrows=Count("id"))
+        .order_by()
+    ):
+        stats[row["borrow_date"], row["book_id"]]["borrows"] = row["borrows"]
+
+    for row in (
+        Borrowing.objects.filter(actual_return_date__range=(start, end))
+        .values("actual_return_date", "book_id")
+        .annotate(
+            returns=Count("id"),
+            late_returns=Count(
+                "id",
+                filter=Q(actual_return_date__gt=F("expected_return_date")),
+            ),
+        )
+        .order_by()
+    ):
+        stats[row["actual_return_date"], row["book_id"]].update(
+            returns=row["returns"], late_returns=row["late_returns"]
+        )
+
+    for row in (
+        Payment.objects.filter(
+            type=Payment.TypeChoices.FINE,
+            borrowing__actual_return_date__range=(start, end),
+        )
+        .values("borrowing__actual_return_date", "borrowing__book_id")
+        .annotate(fines_issued=Sum("money_to_pay"))
+        .order_by()
+    ):
+        key = row["borrowing__actual_return_date"], row["borrowing__book_id"]
+        stats[key]["fines_issued"] = row["fines_issued"]
+
+    for row in (
+        Payment.objects.filter(paid_at__gte=paid_from, paid_at__lt=paid_to)
+        .values("borrowing__book_id", day=TruncDate("paid_at"))
+        .annotate(revenue=Sum("money_to_pay"))
+        .order_by()
+    ):
+        stats[row["day"], row["borrowing__book_id"]]["revenue"] = row[
+            "revenue"
+        ]
+
+    return [
+        DailyBookStats(day=day, book_id=book_id, **values)
+        for (day, book_id), values in sorted(stats.items())
+    ]
+
+
+def roll_up_days(start, end):
+    """Summarize ``start..end`` and advance the high-water mark with it.
+
+    The finished days are read from the replica, if there is one; the
+    rows and the new mark are written together on the primary.
+    """
+    with use_replica():
+        rows = collect_daily_book_stats(start, end)
+
+    with transaction.atomic():
+        DailyBookStats.objects.bulk_create(rows, batch_size=500)
+        RollupState.objects.update_or_create(
+            name=DAILY_BOOK_STATS, defaults={"last_day": end}
+        )
+
+    return len(rows)
+
+
+def get_next_rollup_day():
+    last_day = (
+        RollupState.objects.filter(name=DAILY_BOOK_STATS)
+        .values_list("last_day", flat=True)
+        .first()
+    )
+    if last_day is not None:
+        return last_day + timedelta(days=1)
+
+    return Borrowing.objects.aggregate(first=Min("borrow_date"))["first"]
+
+
+def update_daily_book_stats(until=None, batch_days=ROLLUP_BATCH_DAYS):
+    """Scheduled job rolling every finished day into ``DailyBookStats``.
+
+    Days are summarized only once they are over, so each is read from the
+    hot tables exactly once. Work is committed ``batch_days`` at a time
+    to keep write locks short. Returns the number of rows written.
+    """
+    until = until or timezone.localdate() - timedelta(days=1)
+    start = get_next_rollup_day()
+    written = 0
+
+    while start is not None and start <= until:
+        end = min(until, start + timedelta(days=batch_days - 1))
+        written += roll_up_days(start, end)
+        start = end + timedelta(days=1)
+
+    return written
@@ -1,11 +1,33 @@
+from datetime import timedelta
+
 from django.db import transaction
 from django.utils import timezone
 from rest_framework import serializers
 
+from books.inventory import reserve_copies, reserve_copy, release_copy
+from books.models import Book
 from books.serializers import BookSerializer
+from borrowings.accounts import (
+    has_pending_payments,
+    record_borrowing,
+    record_borrowings,
+    record_borrowing_returned,
+    record_payment,
+)
+from borrowings.availability import (
+    record_borrow,
+    record_borrows,
+    record_return,
+)
 from borrowings.models import Borrowing, Payment
-from borrowings.notification_service import send_telegram_message
-from borrowings.payment_service import create_stripe_session
+from borrowings.notification_service import queue_telegram_message
+from borrowings.payment_service import create_checkout, create_stripe_session
+from borrowings.returns import MAX_BULK_RETURN, RETURN_STATUSES
+
+
+MAX_CART_SIZE = 10
+DEFAULT_ANALYTICS_DAYS = 30
+MAX_ANALYTICS_DAYS = 366
 
 
 class PaymentSerializer(serializers.ModelSerializer):
@@ -41,9 +63,7 @@ class BorrowingSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         user = self.context["request"].user
 
-        if Payment.objects.filter(
-            borrowing__user=user, status=Payment.StatusChoices.PENDING
-        ).exists():
+        if has_pending_payments(user.id):
             raise serializers.ValidationError(
                 "You have pending payments. Cannot borrow a new book."
             )
@@ -62,25 +82,107 @@ class BorrowingSerializer(serializers.ModelSerializer):
         book = validated_data["book"]
         user = self.context["request"].user
 
+        if not reserve_copy(book.id):
+            raise serializers.ValidationError(
+                {"book": "Book is not available for borrowing."}
+            )
+
         borrowing = Borrowing.objects.create(
             expected_return_date=validated_data["expected_return_date"],
             book=book,
             user=user,
         )
+        record_borrow(borrowing)
+        record_borrowing(borrowing)
 
         create_stripe_session(self.context["request"], borrowing)
 
-        book.inventory -= 1
-        book.save()
-
         message = (
             f"New borrowing created:\nUser: {user.email}\nBook: {book.title}"
         )
-        send_telegram_message(message)
+        queue_telegram_message(message)
 
         return borrowing
 
 
+class BorrowingCartSerializer(serializers.Serializer):
+    books = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_CART_SIZE,
+    )
+    expected_return_date = serializers.DateField()
+
+    def validate(self, attrs):
+        user = self.context["request"].user
+
+        if has_pending_payments(user.id):
+            raise serializers.ValidationError(
+                "You have pending payments. Cannot borrow a new book."
+            )
+
+        return attrs
+
+    def validate_books(self, book_ids):
+        if len(set(book_ids)) != len(book_ids):
+            raise serializers.ValidationError("Books must be unique.")
+
+        books = Book.objects.only("id", "title", "inventory", "dayle_fee")
+        books = books.in_bulk(book_ids)
+
+        missing = [book_id for book_id in book_ids if book_id not in books]
+        if missing:
+            raise serializers.ValidationError(
+                f"Books do not exist: {', '.join(map(str, missing))}."
+            )
+
+        unavailable = [
+            books[book_id].title
+            for book_id in book_ids
+            if books[book_id].inventory == 0
+        ]
+        if unavailable:
+            raise serializers.ValidationError(
+                "Books are not available for borrowing: "
+                f"{', '.join(unavailable)}."
+            )
+
+        return [books[book_id] for book_id in book_ids]
+
+    @transaction.atomic
+    def create(self, validated_data):
+        """Borrow every book in the cart or none of them"""
+        books = validated_data["books"]
+        user = self.context["request"].user
+
+        short = reserve_copies({book.id: 1 for book in books})
+        if short is not None:
+            title = next(book.title for book in books if book.id == short)
+            raise serializers.ValidationError(
+                {"books": f"Book is not available for borrowing: {title}."}
+            )
+
+        borrowings = Borrowing.objects.bulk_create(
+            Borrowing(
+                expected_return_date=validated_data["expected_return_date"],
+                book=book,
+                user=user,
+            )
+            for book in books
+        )
+        record_borrows(borrowings)
+        record_borrowings({user.id: len(borrowings)})
+
+        create_checkout(self.context["request"], borrowings)
+
+        titles = "\n".join(f"Book: {book.title}" for book in books)
+        queue_telegram_message(
+            f"New borrowings created:\nUser: {user.email}\n{titles}"
+        )
+
+        return borrowings
+
+
 class BorrowingListSerializer(BorrowingSerializer):
     book = BookSerializer(read_only=True)
     user = serializers.ReadOnlyField(source="user.email")
@@ -102,20 +204,111 @@ class BorrowingReturnSerializer(BorrowingSerializer):
     def save(self, **kwargs):
         borrowing = self.instance
         borrowing.actual_return_date = timezone.now().date()
-        borrowing.save()
 
-        book = borrowing.book
-        book.inventory += 1
-        book.save()
+        returned = Borrowing.objects.filter(
+            pk=borrowing.pk, actual_return_date=None
+        ).update(actual_return_date=borrowing.actual_return_date)
+        if not returned:
+            raise serializers.ValidationError("Book has already been returned")
+
+        release_copy(borrowing.book_id)
+        record_return(borrowing)
+        record_borrowing_returned(borrowing)
 
         if borrowing.actual_return_date > borrowing.expected_return_date:
             fine_amount = borrowing.fine_price
 
-            Payment.objects.create(
+            fine = Payment.objects.create(
                 status=Payment.StatusChoices.PENDING,
                 type=Payment.TypeChoices.FINE,
                 borrowing=borrowing,
                 money_to_pay=fine_amount,
             )
+            record_payment(fine)
 
         return borrowing
+
+
+class BulkReturnSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_BULK_RETURN,
+    )
+
+
+class BulkReturnResultSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=RETURN_STATUSES)
+    fine = serializers.DecimalField(
+        max_digits=8, decimal_places=2, allow_null=True
+    )
+
+
+class FineTotalsSerializer(serializers.Serializer):
+    outstanding_fines = serializers.DecimalField(
+        max_digits=12, decimal_places=2
+    )
+    projected_fines = serializers.DecimalField(max_digits=12, decimal_places=2)
+    overdue_borrowings = serializers.IntegerField()
+
+
+class AnalyticsRangeSerializer(serializers.Serializer):
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    limit = serializers.IntegerField(
+        required=False, min_value=1, max_value=100, default=10
+    )
+
+    def validate(self, attrs):
+        end = attrs.get("end") or timezone.localdate() - timedelta(days=1)
+        start = attrs.get("start") or end - timedelta(
+            days=DEFAULT_ANALYTICS_DAYS - 1
+        )
+
+        if start > end:
+            raise serializers.ValidationError("start must not be after end.")
+        if (end - start).days >= MAX_ANALYTICS_DAYS:
+            raise serializers.ValidationError(
+                f"The range cannot exceed {MAX_ANALYTICS_DAYS} days."
+            )
+
+        return {**attrs, "start": start, "end": end}
+
+
+class DailyStatsSerializer(serializers.Serializer):
+    day = serializers.DateField()
+    borrows = serializers.IntegerField()
+    returns = serializers.IntegerField()
+    late_returns = serializers.IntegerField()
+    fines_issued = serializers.DecimalField(max_digits=14, decimal_places=2)
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class TopBookSerializer(serializers.Serializer):
+    book = serializers.IntegerField()
+    title = serializers.CharField()
+    borrows = serializers.IntegerField()
+    late_returns = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class HistoryPaymentSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status = serializers.CharField()
+    type = serializers.CharField()
+    money_to_pay = serializers.DecimalField(max_digits=8, decimal_places=2)
+    paid_at = serializers.DateTimeField(allow_null=True)
+
+
+class BorrowingHistorySerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    borrow_date = serializers.DateField()
+    expected_return_date = serializers.DateField()
+    actual_return_date = serializers.DateField(allow_null=True)
+    book = serializers.IntegerField()
+    book_title = serializers.CharField(source="book__title")
+    user = serializers.IntegerField()
+    user_email = serializers.EmailField(source="user__email")
+    archived = serializers.BooleanField()
+    payments = HistoryPaymentSerializer(many=True)
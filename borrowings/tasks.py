@@ -1,27 +1,247 @@
+import logging
+import math
 from datetime import date, timedelta
 
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Min, Q
+from django.utils import timezone
+from django_q.tasks import async_task
 
-from borrowings.models import Borrowing
+from borrowings.models import Borrowing, OverdueScan, OverdueScanPartition
 from borrowings.notification_service import send_telegram_message
+from library_service.query_budget import QueryCounter
 
 
-def check_overdue_borrowings_task():
-    today = date.today()
-    tomorrow = today + timedelta(days=1)
+logger = logging.getLogger(__name__)
+
+OVERDUE_CHUNK_SIZE = 2000
+OVERDUE_PARTITION_ROWS = 5000
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+
+def format_overdue_borrowing(row):
+    message = (
+        f"Overdue borrowing:\n"
+        f"Borrowing ID: {row['id']}\n"
+        f"User: {row['user__email']}\n"
+        f"Book: {row['book__title']}"
+    )
+
+    return message[:TELEGRAM_MESSAGE_LIMIT]
+
+
+def pack_digests(entries, limit=TELEGRAM_MESSAGE_LIMIT, separator="\n\n"):
+    """Join ``(key, text)`` entries into as few messages of at most
+    ``limit`` chars; yields ``(message, keys)`` pairs"""
+    digest = ""
+    keys = []
+
+    for key, entry in entries:
+        if digest and len(digest) + len(separator) + len(entry) > limit:
+            yield digest, keys
+            digest = ""
+            keys = []
+
+        digest = f"{digest}{separator}{entry}" if digest else entry
+        keys.append(key)
+
+    if digest:
+        yield digest, keys
+
+
+def get_overdue_candidates(cutoff):
+    """Borrowings due by ``cutoff`` that were not alerted for that date.
+
+    A borrowing whose expected return date moved since its last alert
+    becomes a candidate again.
+    """
+    return Borrowing.objects.filter(
+        Q(overdue_notified_for=None)
+        | ~Q(overdue_notified_for=F("expected_return_date")),
+        expected_return_date__lte=cutoff,
+        actual_return_date=None,
+    )
 
-    overdue_borrowings = Borrowing.objects.filter(
-        expected_return_date__lte=tomorrow, actual_return_date=None
+
+def split_id_range(start_id, end_id, parts):
+    step = math.ceil((end_id - start_id + 1) / parts)
+
+    return [
+        (low, min(low + step - 1, end_id))
+        for low in range(start_id, end_id + 1, step)
+    ]
+
+
+def start_overdue_scan(cutoff):
+    """Create a scan split into partitions of ``OVERDUE_PARTITION_ROWS``"""
+    bounds = get_overdue_candidates(cutoff).aggregate(
+        count=Count("id"), start_id=Min("id"), end_id=Max("id")
     )
 
-    if overdue_borrowings.exists():
-        for borrowing in overdue_borrowings:
-            message = (
-                f"Overdue borrowing:\n"
-                f"Borrowing ID: {borrowing.id}\n"
-                f"User: {borrowing.user.email}\n"
-                f"Book: {borrowing.book.title}"
+    with transaction.atomic():
+        scan = OverdueScan.objects.create(cutoff=cutoff)
+
+        if not bounds["count"]:
+            return scan
+
+        parts = math.ceil(bounds["count"] / OVERDUE_PARTITION_ROWS)
+        OverdueScanPartition.objects.bulk_create(
+            OverdueScanPartition(
+                scan=scan,
+                start_id=start_id,
+                end_id=end_id,
+                checkpoint_id=start_id - 1,
             )
-            send_telegram_message(message)
+            for start_id, end_id in split_id_range(
+                bounds["start_id"], bounds["end_id"], parts
+            )
+        )
+
+    return scan
+
+
+def finish_overdue_scan(scan_id):
+    if OverdueScanPartition.objects.filter(
+        scan_id=scan_id, finished_at=None
+    ).exists():
+        return
+
+    OverdueScan.objects.filter(pk=scan_id, finished_at=None).update(
+        finished_at=timezone.now()
+    )
+
+
+def get_partition_message_budget():
+    """Digests one worker run may send.
+
+    All digests go to the same chat, so a run sends at the per-chat rate
+    and must finish well within the django_q task timeout.
+    """
+    return max(
+        1,
+        int(settings.TELEGRAM["CHAT_RATE"] * settings.Q_CLUSTER["timeout"])
+        // 2,
+    )
+
+
+def queue_next_overdue_partition(scan_id):
+    """Hand the scan's next unfinished partition to a worker"""
+    partition_id = (
+        OverdueScanPartition.objects.filter(scan_id=scan_id, finished_at=None)
+        .order_by("start_id")
+        .values_list("id", flat=True)
+        .first()
+    )
+
+    if partition_id is None:
+        finish_overdue_scan(scan_id)
     else:
-        message = "No borrowings overdue today!"
-        send_telegram_message(message)
+        async_task("borrowings.tasks.scan_overdue_partition", partition_id)
+
+
+def scan_overdue_partition(partition_id, max_messages=None):
+    """Alert about one id range, checkpointing after every message.
+
+    Rows are read in keyset chunks past ``checkpoint_id``, so a worker that
+    dies midway is resumed from its last sent digest. A run stops after
+    ``max_messages`` digests and queues itself to go on; a finished
+    partition queues the next one, so one worker at a time talks to the
+    chat. Returns the rows, queries and messages the run used.
+    """
+    partition = OverdueScanPartition.objects.select_related("scan").get(
+        pk=partition_id
+    )
+    max_messages = max_messages or get_partition_message_budget()
+    counter = QueryCounter()
+    result = {"rows": 0, "messages": 0}
+    budget_spent = False
+
+    with connection.execute_wrapper(counter):
+        while not budget_spent:
+            rows = list(
+                get_overdue_candidates(partition.scan.cutoff)
+                .filter(
+                    id__gt=partition.checkpoint_id,
+                    id__lte=partition.end_id,
+                )
+                .order_by("id")
+                .values("id", "user__email", "book__title")[
+                    :OVERDUE_CHUNK_SIZE
+                ]
+            )
+            if not rows:
+                break
+
+            entries = [
+                (row["id"], format_overdue_borrowing(row)) for row in rows
+            ]
+            for digest, ids in pack_digests(entries):
+                if result["messages"] >= max_messages:
+                    budget_spent = True
+                    break
+
+                # A digest Telegram refused must not be checkpointed
+                send_telegram_message(digest).raise_for_status()
+
+                with transaction.atomic():
+                    Borrowing.objects.filter(id__in=ids).update(
+                        overdue_notified_for=F("expected_return_date")
+                    )
+                    OverdueScanPartition.objects.filter(
+                        pk=partition.pk
+                    ).update(
+                        checkpoint_id=ids[-1],
+                        rows=F("rows") + len(ids),
+                        messages=F("messages") + 1,
+                    )
+
+                partition.checkpoint_id = ids[-1]
+                result["rows"] += len(ids)
+                result["messages"] += 1
+
+        if budget_spent:
+            async_task("borrowings.tasks.scan_overdue_partition", partition.pk)
+        else:
+            OverdueScanPartition.objects.filter(pk=partition.pk).update(
+                finished_at=timezone.now()
+            )
+            queue_next_overdue_partition(partition.scan_id)
+
+    result["queries"] = counter.count
+    logger.info(
+        "Overdue partition %s: %s rows, %s queries, %s messages",
+        partition,
+        result["rows"],
+        result["queries"],
+        result["messages"],
+    )
+
+    return result
+
+
+def check_overdue_borrowings_task():
+    """Alert about newly overdue borrowings.
+
+    An unfinished scan is resumed; otherwise a new one is started for
+    borrowings due by tomorrow. The first unfinished partition runs
+    inline and queues the rest one after another.
+    """
+    scan = OverdueScan.objects.filter(finished_at=None).last()
+    if scan is None:
+        scan = start_overdue_scan(date.today() + timedelta(days=1))
+
+    partition_ids = list(
+        scan.partitions.filter(finished_at=None)
+        .order_by("start_id")
+        .values_list("id", flat=True)
+    )
+
+    if not partition_ids:
+        finish_overdue_scan(scan.pk)
+        if not scan.partitions.exists():
+            send_telegram_message("No new overdue borrowings today!")
+    else:
+        scan_overdue_partition(partition_ids[0])
+
+    return {"scan": scan.pk, "partitions": len(partition_ids)}
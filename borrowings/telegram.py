@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+from functools import cache
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+
+logger = logging.getLogger(__name__)
+
+API_URL = "https://api.telegram.org/bot{token}/sendMessage"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return how long to wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated) * self.rate,
+            )
+            self.updated = now
+            self.tokens -= 1
+
+            return max(0, -self.tokens / self.rate)
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+
+class TelegramClient:
+    """Bot API client sharing one keep-alive connection pool.
+
+    Sends are limited by a global bucket and a bucket per chat, time out
+    instead of hanging and are retried with exponential backoff on
+    connection errors, 429 and 5xx responses. A 429's ``retry_after`` hint
+    takes precedence over the computed delay.
+    """
+
+    def __init__(
+        self,
+        token,
+        chat_id,
+        timeout=(3.05, 10),
+        max_retries=3,
+        backoff=0.5,
+        pool_size=10,
+        global_rate=30,
+        chat_rate=1,
+    ):
+        self.url = API_URL.format(token=token)
+        self.chat_id = chat_id
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.chat_rate = chat_rate
+        self.global_bucket = TokenBucket(global_rate)
+        self.chat_buckets = {}
+        self.chat_buckets_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+
+    def get_chat_bucket(self, chat_id):
+        with self.chat_buckets_lock:
+            if chat_id not in self.chat_buckets:
+                self.chat_buckets[chat_id] = TokenBucket(self.chat_rate)
+
+            return self.chat_buckets[chat_id]
+
+    def get_retry_delay(self, attempt, response=None):
+        if response is not None and response.status_code == 429:
+            try:
+                return response.json()["parameters"]["retry_after"]
+            except (ValueError, KeyError, TypeError):
+                pass
+
+        return self.backoff * 2**attempt
+
+    def send(self, text, chat_id=None):
+        """Send ``text``; returns the last response once retries run out"""
+        chat_id = chat_id or self.chat_id
+        chat_bucket = self.get_chat_bucket(chat_id)
+        payload = {"chat_id": chat_id, "text": text}
+
+        for attempt in range(self.max_retries + 1):
+            chat_bucket.acquire()
+            self.global_bucket.acquire()
+            last_attempt = attempt == self.max_retries
+
+            try:
+                response = self.session.post(
+                    self.url, json=payload, timeout=self.timeout
+                )
+            except (requests.ConnectionError, requests.Timeout) as error:
+                if last_attempt:
+                    raise
+                logger.warning("Telegram request failed: %s", error)
+                time.sleep(self.get_retry_delay(attempt))
+                continue
+
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+
+            logger.warning(
+                "Telegram responded %s, retrying", response.status_code
+            )
+            time.sleep(self.get_retry_delay(attempt, response))
+
+
+@cache
+def get_telegram_client():
+    config = settings.TELEGRAM
+
+    return TelegramClient(
+        config["BOT_TOKEN"],
+        config["CHAT_ID"],
+        timeout=config["TIMEOUT"],
+        max_retries=config["MAX_RETRIES"],
+        backoff=config["BACKOFF"],
+        pool_size=config["POOL_SIZE"],
+        global_rate=config["GLOBAL_RATE"],
+        chat_rate=config["CHAT_RATE"],
+    )
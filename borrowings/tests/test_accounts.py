@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from books.models import Book
+from borrowings.accounts import has_pending_payments
+from borrowings.models import AccountSummary, Borrowing, Payment
+from borrowings.serializers import (
+    BorrowingSerializer,
+    BorrowingReturnSerializer,
+)
+from borrowings.stripe_local import LocalStripe
+from users.models import User
+
+
+@mock.patch("borrowings.serializers.queue_telegram_message")
+class AccountSummaryTests(TestCase):
+    def setUp(self):
+        self.book = Book.objects.create(
+            title="Book 1", inventory=5, dayle_fee=2
+        )
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+        self.request = RequestFactory().post("/")
+        self.request.user = self.user
+
+    def borrow(self):
+        serializer = BorrowingSerializer(
+            data={
+                "book": self.book.id,
+                "expected_return_date": timezone.localdate()
+                + timedelta(days=3),
+            },
+            context={"request": self.request},
+        )
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    def assert_account(self, pending, active, fines):
+        account = AccountSummary.objects.get(pk=self.user.pk)
+
+        self.assertEqual(
+            (
+                account.pending_payments,
+                account.active_borrowings,
+                account.outstanding_fines,
+            ),
+            (pending, active, Decimal(fines)),
+        )
+
+    def test_borrow_pay_and_return(self, mock_queue):
+        borrowing = self.borrow()
+        self.assert_account(1, 1, "0")
+
+        serializer = BorrowingSerializer(
+            data={"book": self.book.id, "expected_return_date": date.today()},
+            context={"request": self.request},
+        )
+        self.assertFalse(serializer.is_valid())
+
+        payment = borrowing.payments.get()
+        payment.session_id = "cs_test"
+        payment.save()
+        with override_settings(STRIPE_WEBHOOK_SECRET="whsec_test"):
+            stripe_local = LocalStripe()
+            stripe_local.deliver(stripe_local.checkout_completed("cs_test"))
+            stripe_local.deliver(stripe_local.checkout_completed("cs_test"))
+
+        self.assert_account(0, 1, "0")
+        self.assertFalse(has_pending_payments(self.user.pk))
+
+        Borrowing.objects.filter(pk=borrowing.pk).update(
+            expected_return_date=timezone.localdate() - timedelta(days=2)
+        )
+        borrowing.refresh_from_db()
+        serializer = BorrowingReturnSerializer(instance=borrowing, data={})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.assert_account(1, 0, "8")
+        self.assertTrue(has_pending_payments(self.user.pk))
+
+    def test_gate_is_a_single_query(self, mock_queue):
+        with self.assertNumQueries(1):
+            self.assertFalse(has_pending_payments(self.user.pk))
+
+    def test_reconcile_accounts(self, mock_queue):
+        borrowing = self.borrow()
+        Payment.objects.create(
+            borrowing=borrowing,
+            status=Payment.StatusChoices.PENDING,
+            type=Payment.TypeChoices.FINE,
+            money_to_pay=Decimal("4.50"),
+        )
+        AccountSummary.objects.filter(pk=self.user.pk).update(
+            active_borrowings=7
+        )
+        out = StringIO()
+
+        call_command("reconcile_accounts", stdout=out)
+
+        self.assert_account(2, 1, "4.50")
+        self.assertIn("1 corrected", out.getvalue())
+
+        call_command("reconcile_accounts", str(self.user.pk), stdout=out)
+        self.assertIn("0 corrected", out.getvalue())
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from books.models import Book
+from borrowings.archive import archive_borrowings
+from borrowings.models import (
+    ArchivedBorrowing,
+    ArchivedPayment,
+    Borrowing,
+    DailyBookStats,
+    Payment,
+    RollupState,
+)
+from borrowings.rollups import DAILY_BOOK_STATS, update_daily_book_stats
+from library_service.query_budget import QueryBudgetTestMixin
+from users.models import User
+
+
+HISTORY_URL = reverse("borrowings:borrowing-history")
+
+
+class ArchiveTests(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.user = User.objects.create_superuser(
+            email="admin@example.com", password="testpass"
+        )
+        self.book = Book.objects.create(
+            title="Book 1", inventory=5, dayle_fee=2
+        )
+        RollupState.objects.create(
+            name=DAILY_BOOK_STATS, last_day=self.today - timedelta(days=1)
+        )
+
+    def borrow(self, returned_ago=None, paid_ago=None, pending=False):
+        borrowing = Borrowing.objects.create(
+            expected_return_date=self.today, book=self.book, user=self.user
+        )
+        if returned_ago is not None:
+            Borrowing.objects.filter(pk=borrowing.pk).update(
+                actual_return_date=self.today - timedelta(days=returned_ago)
+            )
+        if paid_ago is not None:
+            Payment.objects.create(
+                borrowing=borrowing,
+                status=Payment.StatusChoices.PAID,
+                type=Payment.TypeChoices.PAYMENT,
+                money_to_pay=Decimal("6"),
+                paid_at=datetime.now(dt_timezone.utc)
+                - timedelta(days=paid_ago),
+            )
+        if pending:
+            Payment.objects.create(
+                borrowing=borrowing,
+                status=Payment.StatusChoices.PENDING,
+                type=Payment.TypeChoices.FINE,
+                money_to_pay=Decimal("4"),
+            )
+
+        return borrowing
+
+    def test_only_old_settled_borrowings_are_archived(self):
+        settled = [self.borrow(returned_ago=40, paid_ago=45) for _ in range(3)]
+        kept = [
+            self.borrow(returned_ago=40, paid_ago=45, pending=True),
+            self.borrow(returned_ago=40, paid_ago=5),
+            self.borrow(returned_ago=10, paid_ago=12),
+            self.borrow(paid_ago=1),
+        ]
+
+        self.assertEqual(archive_borrowings(after_days=30, chunk_size=2), 3)
+
+        self.assertEqual(
+            sorted(ArchivedBorrowing.objects.values_list("id", flat=True)),
+            [borrowing.id for borrowing in settled],
+        )
+        self.assertEqual(ArchivedPayment.objects.count(), 3)
+        self.assertEqual(
+            sorted(Borrowing.objects.values_list("id", flat=True)),
+            [borrowing.id for borrowing in kept],
+        )
+        self.assertFalse(
+            Payment.objects.filter(borrowing_id__in=[b.id for b in settled])
+        )
+
+    def test_rows_not_yet_rolled_up_stay(self):
+        self.borrow(returned_ago=40, paid_ago=45)
+        RollupState.objects.update(last_day=self.today - timedelta(days=60))
+
+        out = StringIO()
+        call_command("archive_borrowings", "--days=30", stdout=out)
+
+        self.assertIn("Archived borrowings: 0", out.getvalue())
+        self.assertFalse(ArchivedBorrowing.objects.exists())
+
+    def test_nothing_leaves_before_the_first_rollup(self):
+        RollupState.objects.all().delete()
+        borrowing = self.borrow(returned_ago=40, paid_ago=45)
+        Borrowing.objects.filter(pk=borrowing.pk).update(
+            borrow_date=self.today - timedelta(days=42)
+        )
+
+        self.assertEqual(archive_borrowings(after_days=30), 0)
+
+        update_daily_book_stats()
+        self.assertEqual(
+            DailyBookStats.objects.get(borrows=1).day,
+            self.today - timedelta(days=42),
+        )
+        self.assertEqual(
+            DailyBookStats.objects.get(returns=1).day,
+            self.today - timedelta(days=40),
+        )
+
+    def test_history_merges_hot_and_archived_rows(self):
+        first = self.borrow(returned_ago=40, paid_ago=45)
+        second = self.borrow()
+        third = self.borrow(returned_ago=40, paid_ago=45)
+        archive_borrowings(after_days=30)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        page = self.assert_within_query_budget(
+            "get", HISTORY_URL + "?page_size=2"
+        ).data
+        rest = self.client.get(page["next"]).data
+
+        self.assertEqual(
+            [
+                (row["id"], row["archived"], len(row["payments"]))
+                for row in page["results"] + rest["results"]
+            ],
+            [(first.id, True, 1), (second.id, False, 0), (third.id, True, 1)],
+        )
+        self.assertIsNone(rest["next"])
+        self.assertEqual(page["results"][0]["user_email"], self.user.email)
+
+        response = self.client.get(HISTORY_URL + "?is_active=true")
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]], [second.id]
+        )
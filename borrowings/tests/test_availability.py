@@ -0,0 +1,108 @@
+from datetime import date
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.models import Book, BookAvailability
+from borrowings.models import Borrowing
+from borrowings.serializers import (
+    BorrowingSerializer,
+    BorrowingReturnSerializer,
+)
+from users.models import User
+
+
+@mock.patch("borrowings.serializers.queue_telegram_message")
+@mock.patch("borrowings.serializers.create_stripe_session")
+class BookAvailabilityTests(TestCase):
+    def setUp(self):
+        self.book = Book.objects.create(
+            title="Book 1", inventory=2, dayle_fee=2
+        )
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+        self.request = mock.Mock(user=self.user)
+
+    def borrow(self, expected_return_date):
+        serializer = BorrowingSerializer(
+            data={
+                "book": self.book.id,
+                "expected_return_date": expected_return_date,
+            },
+            context={"request": self.request},
+        )
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    def give_back(self, borrowing):
+        serializer = BorrowingReturnSerializer(instance=borrowing, data={})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+    def test_borrow_and_return_update_availability(self, *mocks):
+        later = self.borrow(date(2030, 6, 20))
+        sooner = self.borrow(date(2030, 6, 10))
+
+        availability = BookAvailability.objects.get(book=self.book)
+        self.assertEqual(availability.copies_out, 2)
+        self.assertEqual(availability.next_return_date, date(2030, 6, 10))
+
+        self.give_back(sooner)
+
+        availability.refresh_from_db()
+        self.assertEqual(availability.copies_out, 1)
+        self.assertEqual(availability.next_return_date, date(2030, 6, 20))
+
+        self.give_back(later)
+
+        availability.refresh_from_db()
+        self.assertEqual(availability.copies_out, 0)
+        self.assertIsNone(availability.next_return_date)
+
+    def test_book_endpoints_expose_availability(self, *mocks):
+        self.borrow(date(2030, 6, 10))
+        client = APIClient()
+
+        detail = client.get(reverse("books:book-detail", args=[self.book.id]))
+        self.assertEqual(detail.json()["copies_out"], 1)
+        self.assertEqual(detail.json()["next_return_date"], "2030-06-10")
+
+        other = Book.objects.create(title="Book 2", inventory=1, dayle_fee=1)
+        url = reverse("books:book-availability")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, {"ids": f"{self.book.id},{other.id}"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(
+            response.data,
+            [
+                {
+                    "id": self.book.id,
+                    "inventory": 1,
+                    "copies_out": 1,
+                    "next_return_date": "2030-06-10",
+                },
+                {
+                    "id": other.id,
+                    "inventory": 1,
+                    "copies_out": 0,
+                    "next_return_date": None,
+                },
+            ],
+        )
+
+    def test_availability_rejects_bad_ids(self, *mocks):
+        response = APIClient().get(
+            reverse("books:book-availability"), {"ids": "1,abc"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Borrowing.objects.exists())
@@ -0,0 +1,114 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.models import Book, BookAvailability
+from borrowings.accounts import reconcile_accounts
+from borrowings.models import AccountSummary, Borrowing, Payment
+from library_service.query_budget import QueryBudgetTestMixin
+from users.models import User
+
+
+BULK_RETURN_URL = reverse("borrowings:borrowing-bulk-return")
+
+
+class BulkReturnTests(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            email="admin@example.com", password="testpass"
+        )
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+        self.books = [
+            Book.objects.create(title=f"Book {i}", inventory=0, dayle_fee=2)
+            for i in range(2)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def borrow(self, book, days_left):
+        borrowing = Borrowing.objects.create(
+            expected_return_date=timezone.localdate()
+            + timedelta(days=days_left),
+            book=book,
+            user=self.user,
+        )
+        BookAvailability.objects.update_or_create(
+            book=book, defaults={"copies_out": book.borrowings.count()}
+        )
+        return borrowing
+
+    def test_bulk_return_reports_each_item(self):
+        on_time = self.borrow(self.books[0], 2)
+        late = self.borrow(self.books[0], -3)
+        other = self.borrow(self.books[1], 1)
+        returned = self.borrow(self.books[1], 1)
+        Borrowing.objects.filter(pk=returned.pk).update(
+            actual_return_date=timezone.localdate()
+        )
+        reconcile_accounts()
+
+        response = self.assert_within_query_budget(
+            "post",
+            BULK_RETURN_URL,
+            {"ids": [on_time.id, late.id, other.id, returned.id, 999]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(item["status"], item["fine"]) for item in response.data],
+            [
+                ("returned", None),
+                ("returned", "12.00"),
+                ("returned", None),
+                ("already_returned", None),
+                ("not_found", None),
+            ],
+        )
+        self.assertEqual(
+            Borrowing.objects.filter(actual_return_date=None).count(), 0
+        )
+        self.assertEqual(
+            [book.inventory for book in Book.objects.order_by("id")], [2, 1]
+        )
+        self.assertEqual(
+            BookAvailability.objects.get(book=self.books[0]).copies_out, 0
+        )
+        fine = Payment.objects.get(type=Payment.TypeChoices.FINE)
+        self.assertEqual(fine.borrowing, late)
+        account = AccountSummary.objects.get(pk=self.user.pk)
+        self.assertEqual(account.active_borrowings, 0)
+        self.assertEqual(account.outstanding_fines, Decimal("12"))
+        self.assertEqual(reconcile_accounts(), 0)
+
+    def test_queries_do_not_grow_with_batch_size(self):
+        def count_queries(size):
+            ids = [self.borrow(self.books[i % 2], -1).id for i in range(size)]
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(BULK_RETURN_URL, {"ids": ids}, format="json")
+            return len(queries)
+
+        count_queries(2)  # creates the summary rows the batch updates
+        self.assertEqual(count_queries(2), count_queries(40))
+
+    def test_requires_staff_and_valid_ids(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            BULK_RETURN_URL, {"ids": [1]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(
+            BULK_RETURN_URL, {"ids": []}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,144 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.models import Book, BookAvailability
+from borrowings.accounts import reconcile_accounts
+from borrowings.gateway import get_payment_gateway
+from borrowings.models import AccountSummary, Borrowing, Payment
+from borrowings.outbox import drain_outbox
+from borrowings.serializers import BorrowingCartSerializer
+from library_service.query_budget import QueryBudgetTestMixin
+from users.models import User
+
+
+CART_URL = reverse("borrowings:borrowing-cart")
+FAKE_GATEWAY = {
+    "CLASS": "borrowings.gateway.FakeGateway",
+    "PAYMENT_STATUS": "paid",
+}
+
+
+@override_settings(PAYMENT_GATEWAY=FAKE_GATEWAY)
+@mock.patch("borrowings.payment_service.queue_telegram_message")
+@mock.patch("borrowings.serializers.queue_telegram_message")
+class CartBorrowingTests(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        get_payment_gateway.cache_clear()
+        self.addCleanup(get_payment_gateway.cache_clear)
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+        self.books = [
+            Book.objects.create(title=f"Book {i}", inventory=1, dayle_fee=2)
+            for i in range(3)
+        ]
+        BookAvailability.objects.bulk_create(
+            BookAvailability(book=book) for book in self.books
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.payload = {
+            "books": [book.id for book in self.books],
+            "expected_return_date": timezone.localdate() + timedelta(days=3),
+        }
+
+    def test_cart_borrows_all_books_with_one_session(self, mock_queue, _):
+        response = self.assert_within_query_budget(
+            "post", CART_URL, self.payload, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [item["book"]["title"] for item in response.data],
+            ["Book 0", "Book 1", "Book 2"],
+        )
+        self.assertEqual(
+            set(Book.objects.values_list("inventory", flat=True)), {0}
+        )
+        self.assertEqual(
+            BookAvailability.objects.filter(copies_out=1).count(), 3
+        )
+        account = AccountSummary.objects.get(pk=self.user.pk)
+        self.assertEqual(
+            (account.active_borrowings, account.pending_payments), (3, 3)
+        )
+        self.assertEqual(reconcile_accounts(), 0)
+        mock_queue.assert_called_once()
+
+        gateway = get_payment_gateway()
+        with mock.patch.object(
+            gateway, "_create_session", wraps=gateway._create_session
+        ) as create_session:
+            drain_outbox()
+
+        create_session.assert_called_once()
+        line_items = create_session.call_args.args[0]
+        self.assertEqual(
+            [item["price_data"]["unit_amount"] for item in line_items],
+            [600, 600, 600],
+        )
+        self.assertEqual(
+            Payment.objects.values("session_id").distinct().count(), 1
+        )
+
+    def test_paid_session_confirms_every_payment(self, *mocks):
+        self.client.post(CART_URL, self.payload, format="json")
+        drain_outbox()
+        payment = Payment.objects.order_by("id").first()
+
+        response = self.client.get(
+            reverse("borrowings:payment_success", args=[payment.id])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(
+            Payment.objects.filter(
+                status=Payment.StatusChoices.PENDING
+            ).exists()
+        )
+
+    def test_invalid_carts_are_rejected(self, *mocks):
+        Book.objects.filter(pk=self.books[1].pk).update(inventory=0)
+
+        for books in [
+            [self.books[0].id, self.books[0].id],
+            [self.books[0].id, 999],
+            [book.id for book in self.books],
+        ]:
+            with self.subTest(books=books):
+                response = self.client.post(
+                    CART_URL, {**self.payload, "books": books}, format="json"
+                )
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+
+        self.assertFalse(Borrowing.objects.exists())
+
+    def test_shortfall_rolls_back_the_whole_cart(self, *mocks):
+        Book.objects.filter(pk=self.books[2].pk).update(inventory=0)
+
+        # The last copy goes to someone else between validation and
+        # reservation
+        with mock.patch.object(
+            BorrowingCartSerializer,
+            "validate_books",
+            side_effect=lambda ids: list(Book.objects.filter(id__in=ids)),
+        ):
+            response = self.client.post(CART_URL, self.payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Book 2", response.data["books"])
+        self.assertEqual(
+            list(Book.objects.values_list("inventory", flat=True)), [1, 1, 0]
+        )
+        self.assertFalse(Borrowing.objects.exists())
+        self.assertFalse(Payment.objects.exists())
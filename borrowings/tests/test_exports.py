@@ -0,0 +1,102 @@
+import csv
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.models import Book
+from borrowings.models import Borrowing, Payment
+from users.models import User
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = User.objects.create_user(
+            email="admin@example.com", password="testpass", is_staff=True
+        )
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+        book = Book.objects.create(title="Book 1", inventory=2, dayle_fee=2)
+        self.active = Borrowing.objects.create(
+            expected_return_date=date(2023, 5, 30), book=book, user=self.user
+        )
+        self.returned = Borrowing.objects.create(
+            expected_return_date=date(2023, 5, 30),
+            actual_return_date=date(2023, 5, 29),
+            book=book,
+            user=self.staff,
+        )
+        self.payment = Payment.objects.create(
+            status=Payment.StatusChoices.PENDING,
+            type=Payment.TypeChoices.PAYMENT,
+            borrowing=self.active,
+            money_to_pay=Decimal("12.50"),
+        )
+
+    def read_ndjson(self, response):
+        content = b"".join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_export_requires_staff(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(reverse("borrowings:borrowing-export"))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_borrowings_ndjson(self):
+        self.client.force_authenticate(self.staff)
+
+        response = self.client.get(reverse("borrowings:borrowing-export"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = self.read_ndjson(response)
+        self.assertEqual(
+            [row["id"] for row in rows], [self.active.id, self.returned.id]
+        )
+        self.assertEqual(rows[0]["user__email"], "test@example.com")
+        self.assertEqual(rows[0]["expected_return_date"], "2023-05-30")
+
+    def test_export_borrowings_filters(self):
+        self.client.force_authenticate(self.staff)
+        url = reverse("borrowings:borrowing-export")
+
+        active = self.read_ndjson(self.client.get(url, {"is_active": "true"}))
+        by_user = self.read_ndjson(
+            self.client.get(url, {"user_id": self.staff.id})
+        )
+
+        self.assertEqual([row["id"] for row in active], [self.active.id])
+        self.assertEqual([row["id"] for row in by_user], [self.returned.id])
+
+    def test_export_payments_csv(self):
+        self.client.force_authenticate(self.staff)
+
+        response = self.client.get(
+            reverse("borrowings:payment-export"),
+            {"file_format": "csv", "is_active": "true"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(content.splitlines()))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["id"], str(self.payment.id))
+        self.assertEqual(rows[0]["money_to_pay"], "12.50")
+
+    def test_export_unknown_format(self):
+        self.client.force_authenticate(self.staff)
+
+        response = self.client.get(
+            reverse("borrowings:payment-export"), {"file_format": "xml"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,99 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from books.models import Book, BookAvailability
+from books.serializers import BookListSerializer
+from borrowings.models import Borrowing, Payment
+from borrowings.serializers import BorrowingListSerializer, PaymentSerializer
+from users.models import User
+
+
+class ValuesFastPathParityTests(TestCase):
+    """The ``.values()`` list path must render exactly like the serializers"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="admin@example.com", password="testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+
+        books = [
+            Book.objects.create(
+                title="Book 1",
+                author="Author 1",
+                cover=Book.CoverChoices.HARD,
+                inventory=2,
+                dayle_fee=Decimal("0.5"),
+            ),
+            Book.objects.create(
+                title='Книга 2 "quoted"',
+                author="Author 2",
+                cover=Book.CoverChoices.SOFT,
+                inventory=0,
+                dayle_fee=Decimal("12.25"),
+            ),
+        ]
+        BookAvailability.objects.create(
+            book=books[1], copies_out=1, next_return_date=date(2023, 6, 1)
+        )
+        borrowings = [
+            Borrowing.objects.create(
+                expected_return_date=date(2023, 6, 1),
+                book=books[1],
+                user=self.user,
+            ),
+            Borrowing.objects.create(
+                expected_return_date=date(2023, 5, 20),
+                actual_return_date=date(2023, 5, 25),
+                book=books[0],
+                user=self.user,
+            ),
+        ]
+        Payment.objects.create(
+            status=Payment.StatusChoices.PAID,
+            type=Payment.TypeChoices.PAYMENT,
+            borrowing=borrowings[1],
+            session_url="https://example.com/session",
+            session_id="cs_test",
+            money_to_pay=Decimal("3"),
+        )
+        Payment.objects.create(
+            status=Payment.StatusChoices.PENDING,
+            type=Payment.TypeChoices.FINE,
+            borrowing=borrowings[1],
+            money_to_pay=Decimal("10.10"),
+        )
+
+    def assert_parity(self, url, serializer_class, queryset):
+        response = self.client.get(url)
+        expected = serializer_class(queryset.order_by("id"), many=True).data
+
+        self.assertEqual(
+            response.content,
+            JSONRenderer().render({"next": None, "results": expected}),
+        )
+
+    def test_books_parity(self):
+        self.assert_parity(
+            reverse("books:book-list"), BookListSerializer, Book.objects
+        )
+
+    def test_borrowings_parity(self):
+        self.assert_parity(
+            reverse("borrowings:borrowing-list"),
+            BorrowingListSerializer,
+            Borrowing.objects,
+        )
+
+    def test_payments_parity(self):
+        self.assert_parity(
+            reverse("borrowings:payment-list"),
+            PaymentSerializer,
+            Payment.objects,
+        )
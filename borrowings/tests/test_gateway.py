@@ -0,0 +1,175 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from books.models import Book
+from borrowings.gateway import (
+    CircuitBreaker,
+    FakeGateway,
+    GatewayError,
+    GatewayUnavailable,
+    get_gateway_stats,
+    get_payment_gateway,
+)
+from borrowings.models import Borrowing, Payment
+from users.models import User
+
+
+FAKE_GATEWAY = {
+    "CLASS": "borrowings.gateway.FakeGateway",
+    "PAYMENT_STATUS": "unpaid",
+    "FAILURE_THRESHOLD": 2,
+    "RESET_TIMEOUT": 30,
+    "STATUS_TTL": 30,
+}
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    @mock.patch("borrowings.gateway.time.monotonic")
+    def test_opens_after_failures_and_lets_one_trial_through(
+        self, mock_monotonic
+    ):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        mock_monotonic.return_value = 100
+
+        breaker.before_call()
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+
+        with self.assertRaises(GatewayUnavailable):
+            breaker.before_call()
+
+        mock_monotonic.return_value = 131
+        breaker.before_call()
+        with self.assertRaises(GatewayUnavailable):
+            breaker.before_call()
+
+        breaker.record_success()
+        breaker.before_call()
+
+
+class FakeGatewayTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_sessions_are_idempotent_per_key(self):
+        gateway = FakeGateway()
+
+        first = gateway.create_session([], "https://ok", "https://no", "k1")
+        second = gateway.create_session([], "https://ok", "https://no", "k1")
+
+        self.assertEqual(first, second)
+        self.assertTrue(first[0].startswith("cs_fake_"))
+
+    def test_failures_open_the_circuit_and_are_metered(self):
+        gateway = FakeGateway(failure_rate=1, failure_threshold=2)
+
+        for _ in range(2):
+            with self.assertRaises(GatewayError):
+                gateway.get_session_status("cs_1")
+        with self.assertRaises(GatewayUnavailable):
+            gateway.get_session_status("cs_1")
+
+        stats = get_gateway_stats()["retrieve_session"]
+        self.assertEqual(
+            (stats["calls"], stats["errors"], stats["rejected"]), (2, 2, 1)
+        )
+
+    @mock.patch("borrowings.gateway.time.monotonic")
+    def test_rejected_trial_call_closes_the_circuit(self, mock_monotonic):
+        gateway = FakeGateway(failure_rate=1, failure_threshold=1)
+        mock_monotonic.return_value = 100
+        with self.assertRaises(GatewayError):
+            gateway.get_session_status("cs_1")
+
+        mock_monotonic.return_value = 131
+        with mock.patch.object(
+            gateway, "_retrieve_session", side_effect=ValueError("bad id")
+        ):
+            with self.assertRaises(ValueError):
+                gateway.get_session_status("cs_2")
+
+        gateway.failure_rate = 0
+        self.assertEqual(gateway.get_session_status("cs_3"), "paid")
+
+    def test_session_status_is_cached(self):
+        gateway = FakeGateway(payment_status="paid")
+
+        with mock.patch.object(
+            gateway, "_retrieve_session", return_value="paid"
+        ) as retrieve:
+            gateway.get_session_status("cs_1")
+            gateway.get_session_status("cs_1")
+
+        retrieve.assert_called_once_with("cs_1")
+
+
+@override_settings(PAYMENT_GATEWAY=FAKE_GATEWAY)
+class PaymentSuccessGatewayTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_payment_gateway.cache_clear()
+        self.addCleanup(get_payment_gateway.cache_clear)
+        self.user = User.objects.create_superuser(
+            email="admin@example.com", password="testpass"
+        )
+        book = Book.objects.create(title="Book 1", inventory=2, dayle_fee=2)
+        self.payment = Payment.objects.create(
+            borrowing=Borrowing.objects.create(
+                expected_return_date=date(2030, 5, 30),
+                book=book,
+                user=self.user,
+            ),
+            status=Payment.StatusChoices.PENDING,
+            type=Payment.TypeChoices.PAYMENT,
+            money_to_pay=Decimal("8"),
+            session_id="cs_fake_1",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse(
+            "borrowings:payment_success", args=[self.payment.id]
+        )
+
+    def test_reloads_use_the_cached_status(self):
+        gateway = get_payment_gateway()
+
+        with mock.patch.object(
+            gateway, "_retrieve_session", wraps=gateway._retrieve_session
+        ) as retrieve:
+            for _ in range(3):
+                response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 202)
+        retrieve.assert_called_once_with("cs_fake_1")
+
+    @mock.patch("borrowings.payment_service.queue_telegram_message")
+    def test_paid_session_confirms_the_payment(self, mock_queue):
+        get_payment_gateway().payment_status = "paid"
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.StatusChoices.PAID)
+
+    def test_open_circuit_answers_pending(self):
+        gateway = get_payment_gateway()
+        gateway.failure_rate = 1
+
+        self.assertEqual(self.client.get(self.url).status_code, 202)
+        cache.clear()
+        self.assertEqual(self.client.get(self.url).status_code, 202)
+        cache.clear()
+        self.assertEqual(self.client.get(self.url).status_code, 202)
+
+        stats = self.client.get(
+            reverse("borrowings:payment-gateway-stats")
+        ).data
+        self.assertEqual(stats["retrieve_session"]["rejected"], 1)
@@ -1,11 +1,18 @@
 from unittest.mock import Mock, patch
 
 from django.test import TestCase
-from borrowings.notification_service import send_telegram_message
+from requests import HTTPError
+
+from borrowings.models import OutboxMessage
+from borrowings.notification_service import (
+    send_telegram_message,
+    queue_telegram_message,
+)
+from borrowings.outbox import drain_outbox
 
 
 class SendTelegramMessageTests(TestCase):
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_send_telegram_message(self, mock_post):
         message = "Test message"
 
@@ -16,3 +23,35 @@ class SendTelegramMessageTests(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json, {"text": message})
+
+
+class QueueTelegramMessageTests(TestCase):
+    @patch("requests.Session.post")
+    def test_message_is_sent_by_outbox_worker(self, mock_post):
+        mock_post.return_value = Mock(status_code=200)
+
+        queue_telegram_message("Queued message")
+
+        mock_post.assert_not_called()
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.payload, {"text": "Queued message"})
+
+        drain_outbox()
+
+        self.assertEqual(
+            mock_post.call_args.kwargs["json"]["text"], "Queued message"
+        )
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.StatusChoices.DONE)
+
+    @patch("requests.Session.post")
+    def test_failed_send_is_retried(self, mock_post):
+        mock_post.return_value = Mock(status_code=400)
+        mock_post.return_value.raise_for_status.side_effect = HTTPError("400")
+
+        queue_telegram_message("Queued message")
+        drain_outbox()
+
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.status, OutboxMessage.StatusChoices.PENDING)
+        self.assertEqual(message.attempts, 1)
@@ -0,0 +1,72 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from borrowings.models import OutboxMessage
+from borrowings.outbox import drain_outbox, enqueue, MAX_ATTEMPTS
+
+
+KIND = OutboxMessage.KindChoices.STRIPE_SESSION
+
+
+@mock.patch("borrowings.outbox.import_string")
+class OutboxTests(TestCase):
+    def test_enqueue_schedules_drain_after_commit(self, mock_import):
+        with mock.patch("borrowings.outbox.async_task") as mock_async_task:
+            with self.captureOnCommitCallbacks(execute=True):
+                message = enqueue(KIND, {"payment_id": 1})
+                mock_async_task.assert_not_called()
+
+        mock_async_task.assert_called_once_with(
+            "borrowings.outbox.drain_outbox"
+        )
+        self.assertEqual(message.status, OutboxMessage.StatusChoices.PENDING)
+
+    def test_drain_delivers_message(self, mock_import):
+        message = enqueue(KIND, {"payment_id": 1})
+
+        result = drain_outbox()
+
+        mock_import.return_value.assert_called_once_with({"payment_id": 1})
+        self.assertEqual(result, {"delivered": 1, "failed": 0})
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.StatusChoices.DONE)
+        self.assertEqual(message.attempts, 1)
+        self.assertIsNotNone(message.processed_at)
+
+    def test_failed_message_is_retried_later(self, mock_import):
+        mock_import.return_value.side_effect = ConnectionError("down")
+        message = enqueue(KIND, {"payment_id": 1})
+
+        self.assertEqual(drain_outbox(), {"delivered": 0, "failed": 1})
+        self.assertEqual(drain_outbox(), {"delivered": 0, "failed": 0})
+
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.StatusChoices.PENDING)
+        self.assertGreater(message.available_at, timezone.now())
+        self.assertIn("down", message.last_error)
+
+    def test_message_dead_lettered_after_max_attempts(self, mock_import):
+        mock_import.return_value.side_effect = ConnectionError("down")
+        message = enqueue(KIND, {"payment_id": 1})
+
+        for _ in range(MAX_ATTEMPTS):
+            OutboxMessage.objects.filter(pk=message.pk).update(
+                available_at=timezone.now() - timedelta(seconds=1)
+            )
+            drain_outbox()
+
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.StatusChoices.DEAD)
+        self.assertEqual(message.attempts, MAX_ATTEMPTS)
+
+    def test_leased_message_is_skipped(self, mock_import):
+        message = enqueue(KIND, {"payment_id": 1})
+        OutboxMessage.objects.filter(pk=message.pk).update(
+            available_at=timezone.now() + timedelta(minutes=1)
+        )
+
+        self.assertEqual(drain_outbox(), {"delivered": 0, "failed": 0})
+        mock_import.return_value.assert_not_called()
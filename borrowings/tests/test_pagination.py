@@ -0,0 +1,125 @@
+import json
+from base64 import urlsafe_b64encode
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.models import Book
+from borrowings.models import Borrowing
+from users.models import User
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="staff@example.com", password="testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.book = Book.objects.create(
+            title="Book 1", inventory=2, dayle_fee=2
+        )
+        self.url = reverse("borrowings:borrowing-list")
+        start = date(2023, 6, 1)
+
+        for day in (3, 1, 2, 1, 3, 2, 1):
+            Borrowing.objects.create(
+                expected_return_date=start + timedelta(days=day),
+                book=self.book,
+                user=self.user,
+            )
+
+    def collect(self, url, params):
+        ids = []
+        response = self.client.get(url, params)
+
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            page = response.json()
+            self.assertLessEqual(len(page["results"]), 3)
+            ids.extend(item["id"] for item in page["results"])
+            if page["next"] is None:
+                return ids
+            response = self.client.get(page["next"])
+
+    def test_pages_by_id(self):
+        ids = self.collect(self.url, {"page_size": 3})
+
+        self.assertEqual(ids, [b.id for b in Borrowing.objects.order_by("id")])
+
+    def test_pages_by_expected_return_date(self):
+        ids = self.collect(
+            self.url, {"page_size": 3, "ordering": "expected_return_date"}
+        )
+
+        self.assertEqual(
+            ids,
+            [
+                b.id
+                for b in Borrowing.objects.order_by(
+                    "expected_return_date", "id"
+                )
+            ],
+        )
+
+    def test_later_pages_seek_instead_of_offset(self):
+        response = self.client.get(self.url, {"page_size": 3})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(response.data["next"])
+
+        sql = " ".join(query["sql"] for query in queries.captured_queries)
+        self.assertNotIn("OFFSET", sql)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_values_are_validated(self):
+        cases = [
+            ("id", ["abc"]),
+            ("id", [None]),
+            ("id", [[1]]),
+            ("expected_return_date", ["2023-13-45", 1]),
+            ("expected_return_date", [5, 1]),
+        ]
+        urls = [self.url, reverse("borrowings:borrowing-history")]
+
+        for url in urls:
+            for ordering, position in cases:
+                cursor = urlsafe_b64encode(
+                    json.dumps({"o": ordering, "p": position}).encode()
+                ).decode()
+
+                response = self.client.get(
+                    url, {"cursor": cursor, "ordering": ordering}
+                )
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_404_NOT_FOUND
+                )
+
+    def test_cursor_bound_to_ordering(self):
+        response = self.client.get(self.url, {"page_size": 3})
+
+        response = self.client.get(
+            response.data["next"] + "&ordering=expected_return_date"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_books_are_paginated(self):
+        for number in range(2, 5):
+            Book.objects.create(
+                title=f"Book {number}", inventory=1, dayle_fee=1
+            )
+
+        ids = self.collect(reverse("books:book-list"), {"page_size": 3})
+
+        self.assertEqual(ids, [b.id for b in Book.objects.order_by("id")])
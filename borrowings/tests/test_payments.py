@@ -6,6 +6,7 @@ from django.test import TestCase, RequestFactory
 
 from books.models import Book
 from borrowings.models import Borrowing, Payment
+from borrowings.outbox import drain_outbox
 from borrowings.payment_service import create_stripe_session
 from users.models import User
 
@@ -32,6 +33,12 @@ class StripeSessionCreationTests(TestCase):
         create_stripe_session(request, self.borrowing)
 
         payment = Payment.objects.get(borrowing=self.borrowing)
+        self.assertIsNone(payment.session_url)
+        mock_session_create.assert_not_called()
+
+        drain_outbox()
+
+        payment.refresh_from_db()
 
         self.assertEqual(payment.session_url, "https://example.com/session")
         self.assertEqual(payment.session_id, "session_id")
@@ -0,0 +1,123 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.models import Book
+from borrowings.models import Borrowing, Payment
+from library_service.query_budget import QueryBudgetTestMixin
+from users.models import User
+
+
+FINES_URL = reverse("borrowings:borrowing-fines")
+
+
+class PricingTests(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+        self.book = Book.objects.create(
+            title="Book 1", inventory=5, dayle_fee=Decimal("1.50")
+        )
+
+    def borrow(self, due_in, returned_in=None, user=None):
+        borrowing = Borrowing.objects.create(
+            expected_return_date=self.today + timedelta(days=due_in),
+            book=self.book,
+            user=user or self.user,
+        )
+        Borrowing.objects.filter(pk=borrowing.pk).update(
+            borrow_date=self.today - timedelta(days=10),
+            actual_return_date=(
+                None
+                if returned_in is None
+                else self.today + timedelta(days=returned_in)
+            ),
+        )
+        borrowing.refresh_from_db()
+        return borrowing
+
+    def test_annotations_match_the_properties(self):
+        late = self.borrow(-6, returned_in=-2)
+        early = self.borrow(-6, returned_in=-8)
+        active = self.borrow(3)
+
+        annotated = Borrowing.objects.with_prices().in_bulk()
+
+        for borrowing in (late, early, active):
+            self.assertEqual(
+                annotated[borrowing.id].price_amount, borrowing.total_price
+            )
+        self.assertEqual(annotated[late.id].fine_amount, late.fine_price)
+        self.assertEqual(annotated[late.id].fine_amount, Decimal("12.00"))
+        self.assertEqual(annotated[early.id].fine_amount, 0)
+
+        projected = Borrowing.objects.with_fine_as_of(self.today).get(
+            pk=active.pk
+        )
+        self.assertEqual(projected.fine_amount, 0)
+
+    def test_fine_totals(self):
+        returned = self.borrow(-6, returned_in=-2)
+        Payment.objects.create(
+            borrowing=returned,
+            status=Payment.StatusChoices.PENDING,
+            type=Payment.TypeChoices.FINE,
+            money_to_pay=returned.fine_price,
+        )
+        Payment.objects.create(
+            borrowing=returned,
+            status=Payment.StatusChoices.PENDING,
+            type=Payment.TypeChoices.PAYMENT,
+            money_to_pay=Decimal("24"),
+        )
+        self.borrow(-4)
+        self.borrow(-1)
+        self.borrow(2)
+        other = User.objects.create_user(
+            email="other@example.com", password="testpass"
+        )
+        self.borrow(-10, user=other)
+
+        with self.assertNumQueries(1):
+            totals = Borrowing.objects.filter(user=self.user).fine_totals()
+
+        self.assertEqual(
+            totals,
+            {
+                "outstanding_fines": Decimal("12.00"),
+                "projected_fines": Decimal("15.00"),
+                "overdue_borrowings": 2,
+            },
+        )
+
+    def test_fines_endpoint(self):
+        self.borrow(-4)
+        self.client = APIClient()
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get(FINES_URL)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(
+            User.objects.create_superuser(
+                email="admin@example.com", password="testpass"
+            )
+        )
+        response = self.assert_within_query_budget(
+            "get", FINES_URL + f"?user_id={self.user.id}"
+        )
+        self.assertEqual(
+            response.data,
+            {
+                "outstanding_fines": "0.00",
+                "projected_fines": "12.00",
+                "overdue_borrowings": 1,
+            },
+        )
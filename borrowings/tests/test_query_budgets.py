@@ -0,0 +1,169 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from books.models import Book
+from books.views import BookViewSet
+from borrowings.models import Borrowing, Payment
+from borrowings.stripe_local import LocalStripe
+from library_service.query_budget import (
+    QueryBudgetExceeded,
+    QueryBudgetTestMixin,
+)
+from users.models import User
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """Endpoints stay within the query budgets their views declare"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_superuser(
+            email="admin@example.com", password="testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.book = Book.objects.create(
+            title="Book 1", author="Author", inventory=100, dayle_fee=2
+        )
+
+    def create_borrowings(self, count):
+        due = timezone.localdate() + timedelta(days=3)
+        borrowings = Borrowing.objects.bulk_create(
+            Borrowing(expected_return_date=due, book=self.book, user=self.user)
+            for _ in range(count)
+        )
+        Payment.objects.bulk_create(
+            Payment(
+                borrowing=borrowing,
+                status=Payment.StatusChoices.PENDING,
+                type=Payment.TypeChoices.PAYMENT,
+                money_to_pay=6,
+                session_id="cs_test",
+            )
+            for borrowing in borrowings
+        )
+
+        return borrowings[-1]
+
+    def count_queries(self, url):
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+
+        return len(queries)
+
+    def test_read_endpoints(self):
+        borrowing = self.create_borrowings(1)
+        payment = borrowing.payments.get()
+
+        for url in [
+            reverse("borrowings:borrowing-list"),
+            reverse("borrowings:borrowing-detail", args=[borrowing.id]),
+            reverse("borrowings:payment-list"),
+            reverse("borrowings:payment-detail", args=[payment.id]),
+            reverse("books:book-list"),
+            reverse("books:book-detail", args=[self.book.id]),
+            reverse("books:book-search") + "?q=Book",
+            reverse("books:book-availability") + f"?ids={self.book.id}",
+        ]:
+            with self.subTest(url=url):
+                cache.clear()
+                self.assert_within_query_budget("get", url)
+
+    @mock.patch("borrowings.serializers.queue_telegram_message")
+    @mock.patch("borrowings.payment_service.enqueue")
+    def test_write_endpoints(self, *mocks):
+        response = self.assert_within_query_budget(
+            "post",
+            reverse("borrowings:borrowing-list"),
+            {
+                "book": self.book.id,
+                "expected_return_date": timezone.localdate()
+                + timedelta(days=3),
+            },
+        )
+        borrowing = Borrowing.objects.get(pk=response.data["id"])
+        Borrowing.objects.filter(pk=borrowing.pk).update(
+            expected_return_date=timezone.localdate() - timedelta(days=1)
+        )
+
+        self.assert_within_query_budget(
+            "post",
+            reverse("borrowings:borrowing-book-return", args=[borrowing.id]),
+        )
+
+    @override_settings(STRIPE_WEBHOOK_SECRET="whsec_test")
+    @mock.patch("borrowings.payment_service.queue_telegram_message")
+    def test_payment_webhook_and_success(self, mock_queue):
+        payment = self.create_borrowings(1).payments.get()
+        event = LocalStripe().checkout_completed(payment.session_id)
+        payload = json.dumps(event)
+
+        self.assert_within_query_budget(
+            "post",
+            reverse("borrowings:stripe_webhook"),
+            payload,
+            content_type="application/json",
+            HTTP_STRIPE_SIGNATURE=LocalStripe().sign(payload),
+        )
+        self.assert_within_query_budget(
+            "get", reverse("borrowings:payment_success", args=[payment.id])
+        )
+        self.assertIn(
+            "admin@example.com: Book 1", mock_queue.call_args.args[0]
+        )
+
+    def test_list_queries_do_not_grow_with_page_size(self):
+        urls = [
+            reverse("borrowings:borrowing-list"),
+            reverse("borrowings:payment-list"),
+            reverse("books:book-list") + "?page_size=100",
+            reverse("books:book-search") + "?q=Book",
+        ]
+        self.create_borrowings(1)
+        counts = {url: self.count_queries(url) for url in urls}
+
+        self.create_borrowings(30)
+        Book.objects.bulk_create(
+            Book(title=f"Book {i}", inventory=1, dayle_fee=1)
+            for i in range(2, 32)
+        )
+
+        for url in urls:
+            self.assertEqual(self.count_queries(url), counts[url], url)
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Book.objects.create(title="Book 1", inventory=1, dayle_fee=1)
+
+    @override_settings(QUERY_BUDGET_MODE="warn")
+    def test_overrun_is_logged(self):
+        with mock.patch.object(BookViewSet, "query_budgets", {"list": 0}):
+            with self.assertLogs("library_service.query_budget") as logs:
+                response = APIClient().get(reverse("books:book-list"))
+
+        self.assertEqual(response["X-Query-Count"], "1")
+        self.assertIn("budget is 0", logs.output[0])
+
+    @override_settings(QUERY_BUDGET_MODE="raise")
+    def test_overrun_raises(self):
+        with mock.patch.object(BookViewSet, "query_budgets", {"list": 0}):
+            with self.assertRaises(QueryBudgetExceeded):
+                APIClient().get(reverse("books:book-list"))
+
+    def test_disabled_by_default(self):
+        response = APIClient().get(reverse("books:book-list"))
+
+        self.assertNotIn("X-Query-Count", response)
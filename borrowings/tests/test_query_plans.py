@@ -0,0 +1,130 @@
+import re
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test import TestCase
+
+from books.models import Book
+from borrowings.models import AccountSummary, Borrowing, Payment
+from borrowings.tasks import get_overdue_candidates
+from users.models import User
+
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+class HotQueryPlanTests(TestCase):
+    """Fail when a hot query regresses to a full table scan"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+        self.book = Book.objects.create(
+            title="Book 1", author="Author", inventory=2, dayle_fee=2
+        )
+
+    def get_plan(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assert_no_full_scan(self, queryset):
+        plan = self.get_plan(*queryset.query.sql_with_params())
+        scans = [step for step in plan if FULL_SCAN.match(step)]
+
+        self.assertFalse(scans, "\n".join(plan))
+
+    def assert_uses_index(self, queryset, index_name):
+        plan = self.get_plan(*queryset.query.sql_with_params())
+
+        self.assertTrue(
+            any(index_name in step for step in plan), "\n".join(plan)
+        )
+
+    def test_overdue_scan(self):
+        queryset = get_overdue_candidates(date.today() + timedelta(days=1))
+
+        self.assert_no_full_scan(queryset)
+        self.assert_uses_index(queryset, "borrowing_active_due_idx")
+
+    def test_pending_payment_gate(self):
+        # BorrowingSerializer.validate
+        queryset = AccountSummary.objects.filter(
+            pk=self.user.pk, pending_payments__gt=0
+        ).values("pk")[:1]
+
+        self.assert_no_full_scan(queryset)
+        self.assert_uses_index(queryset, "(user_id=?)")
+
+    def test_account_reconciliation(self):
+        # borrowings.accounts.reconcile_accounts
+        queryset = Payment.objects.filter(
+            borrowing__user=self.user, status=Payment.StatusChoices.PENDING
+        ).values("id")
+
+        self.assert_no_full_scan(queryset)
+        self.assert_uses_index(queryset, "payment_borrowing_status_idx")
+
+    def test_user_borrowings(self):
+        # BorrowingViewSet.get_queryset with ?is_active=
+        active = Borrowing.objects.filter(
+            user=self.user, actual_return_date=None
+        )
+        returned = Borrowing.objects.filter(user=self.user).exclude(
+            actual_return_date=None
+        )
+
+        self.assert_no_full_scan(active)
+        self.assert_uses_index(active, "borrowing_user_returned_idx")
+        self.assert_no_full_scan(returned)
+
+    def test_next_return_date(self):
+        # borrowings.availability.record_return
+        queryset = (
+            Borrowing.objects.filter(book=self.book, actual_return_date=None)
+            .order_by("expected_return_date")
+            .values("expected_return_date")[:1]
+        )
+
+        self.assert_no_full_scan(queryset)
+        self.assert_uses_index(queryset, "borrowing_book_active_idx")
+
+    def test_keyset_page_by_expected_return_date(self):
+        # library_service.pagination.BorrowingPagination
+        queryset = Borrowing.objects.filter(
+            expected_return_date__gt=date(2023, 6, 1)
+        ) | Borrowing.objects.filter(
+            expected_return_date=date(2023, 6, 1), id__gt=10
+        )
+
+        self.assert_no_full_scan(
+            queryset.order_by("expected_return_date", "id")[:50]
+        )
+
+    def test_page_payments(self):
+        # BorrowingViewSet.prepare_rows
+        queryset = Payment.objects.filter(borrowing_id__in=[1, 2, 3])
+
+        self.assert_no_full_scan(queryset)
+
+    def test_import_natural_key_lookup(self):
+        # books.importer.import_chunk
+        queryset = Book.objects.filter(title__in=["Book 1", "Book 2"])
+
+        self.assert_no_full_scan(queryset)
+        self.assert_uses_index(queryset, "book_natural_key_idx")
+
+    def test_full_text_search(self):
+        # books.search.search_books
+        plan = self.get_plan(
+            "SELECT books_book.* FROM books_book_fts "
+            "JOIN books_book ON books_book.id = books_book_fts.rowid "
+            "WHERE books_book_fts MATCH %s "
+            "ORDER BY bm25(books_book_fts) LIMIT %s",
+            ['"book"*', 20],
+        )
+
+        self.assertFalse(
+            [step for step in plan if FULL_SCAN.match(step)], "\n".join(plan)
+        )
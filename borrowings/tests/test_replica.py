@@ -0,0 +1,141 @@
+import sqlite3
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from books.models import Book
+from borrowings.models import Borrowing, DailyBookStats
+from borrowings.rollups import update_daily_book_stats
+from library_service.db_router import ReplicaRouter, use_replica
+from users.models import User
+
+
+BOOK_LIST_URL = reverse("books:book-list")
+BORROWING_LIST_URL = reverse("borrowings:borrowing-list")
+REPLICA = "replica_file"
+
+
+@override_settings(DATABASE_REPLICA={"ALIAS": REPLICA, "STICKY_SECONDS": 5})
+class ReplicaRoutingTests(TransactionTestCase):
+    """Routing against a second SQLite file standing in for the replica"""
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.replica_path = Path(directory.name) / "replica.sqlite3"
+
+        connections.settings[REPLICA] = connections.configure_settings(
+            {
+                "default": connections.settings["default"],
+                REPLICA: {
+                    "ENGINE": "django.db.backends.sqlite3",
+                    "NAME": str(self.replica_path),
+                },
+            }
+        )[REPLICA]
+        self.addCleanup(connections.settings.pop, REPLICA)
+        self.addCleanup(self.close_replica)
+
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+        self.book = Book.objects.create(
+            title="Book 1", inventory=5, dayle_fee=2
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def close_replica(self):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+
+    def replicate(self):
+        """Copy the primary into the replica file, like replication would"""
+        connections[REPLICA].close()
+        primary = connections["default"]
+        primary.ensure_connection()
+        replica = sqlite3.connect(self.replica_path)
+        primary.connection.backup(replica)
+        replica.close()
+
+    def borrow(self):
+        return Borrowing.objects.create(
+            expected_return_date=timezone.localdate() + timedelta(days=3),
+            book=self.book,
+            user=self.user,
+        )
+
+    def list_ids(self):
+        response = self.client.get(BORROWING_LIST_URL)
+        return [row["id"] for row in response.data["results"]]
+
+    def test_safe_requests_read_from_the_replica(self):
+        replicated = self.borrow()
+        self.replicate()
+        self.borrow()
+
+        with CaptureQueriesContext(connections[REPLICA]) as queries:
+            self.assertEqual(self.list_ids(), [replicated.id])
+
+        self.assertTrue(queries.captured_queries)
+
+    @mock.patch("borrowings.serializers.queue_telegram_message")
+    @mock.patch("borrowings.payment_service.enqueue")
+    def test_writers_read_their_own_writes(self, *mocks):
+        self.replicate()
+
+        response = self.client.post(
+            BORROWING_LIST_URL,
+            {
+                "book": self.book.id,
+                "expected_return_date": timezone.localdate()
+                + timedelta(days=3),
+            },
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.list_ids(), [response.data["id"]])
+
+        cache.clear()  # the sticky window is over
+        self.assertEqual(self.list_ids(), [])
+
+    def test_cached_catalog_pages_are_read_from_the_primary(self):
+        self.replicate()
+        book = Book.objects.create(title="Book 2", inventory=1, dayle_fee=1)
+
+        with CaptureQueriesContext(connections[REPLICA]) as queries:
+            response = APIClient().get(BOOK_LIST_URL)
+
+        self.assertFalse(queries.captured_queries)
+        self.assertIn(
+            book.id, [row["id"] for row in response.json()["results"]]
+        )
+
+    def test_transactions_and_jobs(self):
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(Borrowing), "default")
+
+        with use_replica():
+            self.assertEqual(router.db_for_read(Borrowing), REPLICA)
+
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(Borrowing), "default")
+
+        self.borrow()
+        self.replicate()
+        with CaptureQueriesContext(connections[REPLICA]) as queries:
+            update_daily_book_stats(until=timezone.localdate())
+
+        self.assertTrue(queries.captured_queries)
+        self.assertEqual(DailyBookStats.objects.get().borrows, 1)
+        self.assertFalse(router.allow_migrate(REPLICA, "borrowings"))
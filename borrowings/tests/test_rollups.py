@@ -0,0 +1,175 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.models import Book
+from borrowings.models import (
+    Borrowing,
+    DailyBookStats,
+    Payment,
+    RollupState,
+)
+from borrowings.rollups import DAILY_BOOK_STATS, update_daily_book_stats
+from library_service.query_budget import QueryBudgetTestMixin
+from users.models import User
+
+
+DAY = date(2026, 3, 10)
+
+
+class DailyRollupTests(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser(
+            email="admin@example.com", password="testpass"
+        )
+        self.books = [
+            Book.objects.create(title=f"Book {i}", inventory=5, dayle_fee=2)
+            for i in range(2)
+        ]
+
+    def borrow(self, book, borrowed, due, returned=None, fine=None):
+        borrowing = Borrowing.objects.create(
+            expected_return_date=due, book=book, user=self.user
+        )
+        Borrowing.objects.filter(pk=borrowing.pk).update(
+            borrow_date=borrowed, actual_return_date=returned
+        )
+        if fine is not None:
+            Payment.objects.create(
+                borrowing=borrowing,
+                status=Payment.StatusChoices.PENDING,
+                type=Payment.TypeChoices.FINE,
+                money_to_pay=fine,
+            )
+
+        return borrowing
+
+    def pay(self, borrowing, amount, paid_on):
+        Payment.objects.create(
+            borrowing=borrowing,
+            status=Payment.StatusChoices.PAID,
+            type=Payment.TypeChoices.PAYMENT,
+            money_to_pay=amount,
+            paid_at=datetime.combine(
+                paid_on, datetime.min.time(), dt_timezone.utc
+            )
+            + timedelta(hours=12),
+        )
+
+    def create_activity(self):
+        first, second = self.books
+        on_time = self.borrow(first, DAY, DAY + timedelta(days=3))
+        self.pay(on_time, Decimal("6"), DAY)
+        self.borrow(
+            first,
+            DAY - timedelta(days=5),
+            DAY - timedelta(days=2),
+            returned=DAY,
+            fine=Decimal("8"),
+        )
+        self.borrow(
+            second,
+            DAY + timedelta(days=1),
+            DAY + timedelta(days=4),
+            returned=DAY + timedelta(days=2),
+        )
+
+    def get_stats(self):
+        return {
+            (row.day, row.book_id): (
+                row.borrows,
+                row.returns,
+                row.late_returns,
+                row.fines_issued,
+                row.revenue,
+            )
+            for row in DailyBookStats.objects.all()
+        }
+
+    def test_rollup_is_incremental(self):
+        self.create_activity()
+        first, second = self.books
+
+        update_daily_book_stats(until=DAY + timedelta(days=1))
+
+        self.assertEqual(
+            RollupState.objects.get(name=DAILY_BOOK_STATS).last_day,
+            DAY + timedelta(days=1),
+        )
+        self.assertEqual(
+            self.get_stats(),
+            {
+                (DAY - timedelta(days=5), first.id): (1, 0, 0, 0, 0),
+                (DAY, first.id): (1, 1, 1, Decimal("8"), Decimal("6")),
+                (DAY + timedelta(days=1), second.id): (1, 0, 0, 0, 0),
+            },
+        )
+
+        update_daily_book_stats(until=DAY + timedelta(days=1))
+        self.assertEqual(DailyBookStats.objects.count(), 3)
+
+        self.assertEqual(update_daily_book_stats(until=DAY + timedelta(3)), 1)
+        self.assertEqual(
+            self.get_stats()[DAY + timedelta(days=2), second.id],
+            (0, 1, 0, 0, 0),
+        )
+
+    def test_analytics_never_read_hot_tables(self):
+        self.create_activity()
+        update_daily_book_stats(until=DAY + timedelta(days=3))
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.client = client
+        params = f"?start={DAY - timedelta(days=30)}&end={DAY}"
+
+        with CaptureQueriesContext(connection) as queries:
+            daily = self.assert_within_query_budget(
+                "get", reverse("borrowings:analytics-daily") + params
+            )
+            top = self.assert_within_query_budget(
+                "get", reverse("borrowings:analytics-top-books") + params
+            )
+
+        for query in queries.captured_queries:
+            self.assertNotIn("borrowings_borrowing", query["sql"])
+            self.assertNotIn("borrowings_payment", query["sql"])
+        self.assertEqual(
+            daily.data[-1],
+            {
+                "day": str(DAY),
+                "borrows": 1,
+                "returns": 1,
+                "late_returns": 1,
+                "fines_issued": "8.00",
+                "revenue": "6.00",
+            },
+        )
+        self.assertEqual(
+            [(book["title"], book["borrows"]) for book in top.data],
+            [("Book 0", 2)],
+        )
+
+    def test_analytics_validation_and_permissions(self):
+        self.client = APIClient()
+        url = reverse("borrowings:analytics-daily")
+
+        self.assertEqual(
+            self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED
+        )
+
+        self.client.force_authenticate(self.user)
+        for params in [
+            "?start=2026-03-10&end=2026-03-01",
+            "?start=2020-01-01",
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get(url + params)
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
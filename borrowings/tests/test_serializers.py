@@ -3,8 +3,10 @@ from unittest import mock
 
 from _decimal import Decimal
 from django.test import TestCase
+from rest_framework.exceptions import ValidationError
 
 from books.models import Book
+from borrowings.accounts import record_payment
 from borrowings.models import Payment, Borrowing
 from borrowings.serializers import BorrowingSerializer
 from users.models import User
@@ -25,17 +27,25 @@ class BorrowingSerializerTests(TestCase):
         )
 
     def test_validate_with_pending_payments(self):
-        Payment.objects.create(
+        payment = Payment.objects.create(
             borrowing=self.borrowing,
             status=Payment.StatusChoices.PENDING,
             money_to_pay=Decimal("8"),
         )
+        record_payment(payment)
 
         serializer = BorrowingSerializer(
-            data={}, context={"request": mock.Mock(user=self.user)}
+            data={
+                "book": self.book.id,
+                "expected_return_date": date(2023, 5, 30),
+            },
+            context={"request": mock.Mock(user=self.user)},
         )
         self.assertFalse(serializer.is_valid())
-        self.assertTrue(serializer.errors)
+        self.assertEqual(
+            serializer.errors["non_field_errors"][0],
+            "You have pending payments. Cannot borrow a new book.",
+        )
 
     def test_validate_book_unavailable(self):
         self.book.inventory = 0
@@ -72,3 +82,20 @@ class BorrowingSerializerTests(TestCase):
         self.assertEqual(borrowing.payments.count(), 0)
 
         mock_create_session.assert_called_once_with(mock.ANY, borrowing)
+
+    def test_create_borrowing_when_last_copy_taken_meanwhile(self):
+        serializer = BorrowingSerializer(
+            data={
+                "book": self.book.id,
+                "expected_return_date": date(2023, 5, 30),
+            },
+            context={"request": mock.Mock(user=self.user)},
+        )
+        self.assertTrue(serializer.is_valid())
+
+        Book.objects.filter(pk=self.book.id).update(inventory=0)
+
+        with self.assertRaises(ValidationError):
+            serializer.save()
+
+        self.assertEqual(Borrowing.objects.count(), 1)
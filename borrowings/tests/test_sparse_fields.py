@@ -0,0 +1,129 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.models import Book
+from books.views import BookViewSet
+from borrowings.models import Borrowing, Payment
+from users.models import User
+
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.book = Book.objects.create(
+            title="Book 1", author="Author", inventory=2, dayle_fee=2
+        )
+        self.borrowing = Borrowing.objects.create(
+            expected_return_date=date(2023, 5, 30),
+            book=self.book,
+            user=self.user,
+        )
+        Payment.objects.create(
+            status=Payment.StatusChoices.PENDING,
+            type=Payment.TypeChoices.PAYMENT,
+            borrowing=self.borrowing,
+            money_to_pay=Decimal("8"),
+        )
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json(), [query["sql"] for query in queries]
+
+    def test_book_list_fields(self):
+        data, queries = self.get(
+            reverse("books:book-list"), {"fields": "id,title,inventory"}
+        )
+
+        self.assertEqual(
+            data["results"],
+            [{"id": self.book.id, "title": "Book 1", "inventory": 2}],
+        )
+        self.assertNotIn("dayle_fee", queries[-1])
+        self.assertNotIn("availability", queries[-1])
+
+    def test_borrowing_list_skips_unrequested_payments(self):
+        data, queries = self.get(
+            reverse("borrowings:borrowing-list"),
+            {"fields": "id,expected_return_date"},
+        )
+
+        self.assertEqual(
+            data["results"],
+            [{"id": self.borrowing.id, "expected_return_date": "2023-05-30"}],
+        )
+        self.assertFalse(any("borrowings_payment" in sql for sql in queries))
+        self.assertFalse(any("books_book" in sql for sql in queries))
+
+    def test_borrowing_list_exclude(self):
+        data, _ = self.get(
+            reverse("borrowings:borrowing-list"), {"exclude": "payments,book"}
+        )
+
+        self.assertEqual(
+            set(data["results"][0]),
+            {
+                "id",
+                "borrow_date",
+                "expected_return_date",
+                "actual_return_date",
+                "user",
+            },
+        )
+
+    def test_borrowing_retrieve_narrows_columns(self):
+        data, queries = self.get(
+            reverse("borrowings:borrowing-detail", args=[self.borrowing.id]),
+            {"fields": "id,user"},
+        )
+
+        self.assertEqual(
+            data, {"id": self.borrowing.id, "user": "test@example.com"}
+        )
+        borrowing_query = next(
+            sql for sql in queries if "borrowings_borrowing" in sql
+        )
+        self.assertNotIn("expected_return_date", borrowing_query)
+        self.assertNotIn("books_book", borrowing_query)
+        self.assertFalse(any("borrowings_payment" in sql for sql in queries))
+
+    def test_payment_list_fields(self):
+        data, _ = self.get(
+            reverse("borrowings:payment-list"), {"fields": "id,status"}
+        )
+
+        self.assertEqual(set(data["results"][0]), {"id", "status"})
+
+    def test_book_retrieve_fields(self):
+        data, queries = self.get(
+            reverse("books:book-detail", args=[self.book.id]),
+            {"fields": "title,copies_out"},
+        )
+
+        self.assertEqual(data, {"title": "Book 1", "copies_out": 0})
+        self.assertNotIn("dayle_fee", queries[-1])
+
+    def test_unknown_names_share_one_mapper(self):
+        url = reverse("books:book-list")
+        self.get(url, {"fields": "id,title"})
+        mappers = len(BookViewSet.values_mappers)
+
+        for junk in ("x", "y", "title,,id"):
+            data, _ = self.get(url, {"fields": f"id,title,{junk}"})
+            self.assertEqual(set(data["results"][0]), {"id", "title"})
+
+        self.get(url, {"exclude": "nothing"})
+        self.assertEqual(len(BookViewSet.values_mappers), mappers)
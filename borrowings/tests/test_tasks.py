@@ -1,12 +1,18 @@
 from datetime import timedelta
 from unittest import mock
 
+import requests
 from django.test import TestCase
 from django.utils import timezone
 
 from books.models import Book
-from borrowings.models import Borrowing
-from borrowings.tasks import check_overdue_borrowings_task
+from borrowings.models import Borrowing, OverdueScan, OverdueScanPartition
+from borrowings.tasks import (
+    check_overdue_borrowings_task,
+    get_partition_message_budget,
+    scan_overdue_partition,
+    start_overdue_scan,
+)
 from users.models import User
 
 
@@ -38,3 +44,168 @@ class OverdueBorrowingsTaskTests(TestCase):
             f"Book: {overdue_borrowing.book.title}"
         )
         mock_send_telegram_message.assert_called_once_with(expected_message)
+
+    def create_overdue(self, count, days=1):
+        Borrowing.objects.bulk_create(
+            Borrowing(
+                expected_return_date=timezone.localdate()
+                - timedelta(days=days),
+                book=self.book,
+                user=self.user,
+            )
+            for _ in range(count)
+        )
+
+    def run_task(self):
+        with mock.patch(
+            "borrowings.tasks.send_telegram_message"
+        ) as mock_send_telegram_message:
+            check_overdue_borrowings_task()
+
+        return [
+            call.args[0] for call in mock_send_telegram_message.call_args_list
+        ]
+
+    def test_overdue_borrowings_are_packed_into_digests(self):
+        self.create_overdue(100)
+
+        with mock.patch("borrowings.tasks.send_telegram_message") as mock_send:
+            scan = start_overdue_scan(timezone.localdate())
+            result = scan_overdue_partition(scan.partitions.get().id)
+
+        messages = [call.args[0] for call in mock_send.call_args_list]
+        self.assertEqual(result["rows"], 100)
+        self.assertEqual(result["messages"], len(messages))
+        self.assertLessEqual(result["queries"], 6 + 4 * len(messages))
+        self.assertLess(len(messages), 10)
+        self.assertTrue(all(len(message) <= 4096 for message in messages))
+        self.assertEqual(
+            sum(message.count("Overdue borrowing:") for message in messages),
+            100,
+        )
+        scan.refresh_from_db()
+        self.assertIsNotNone(scan.finished_at)
+
+    def test_only_new_or_changed_borrowings_are_reported(self):
+        self.create_overdue(2)
+        self.assertEqual(len(self.run_task()), 1)
+
+        self.assertEqual(self.run_task(), ["No new overdue borrowings today!"])
+
+        borrowing = Borrowing.objects.first()
+        borrowing.expected_return_date = timezone.localdate()
+        borrowing.save()
+        messages = self.run_task()
+
+        self.assertEqual(len(messages), 1)
+        self.assertIn(f"Borrowing ID: {borrowing.id}\n", messages[0])
+        self.assertEqual(messages[0].count("Overdue borrowing:"), 1)
+
+    def test_interrupted_scan_resumes_from_checkpoint(self):
+        self.create_overdue(3)
+        ids = list(
+            Borrowing.objects.order_by("id").values_list("id", flat=True)
+        )
+        scan = start_overdue_scan(timezone.localdate())
+        OverdueScanPartition.objects.filter(scan=scan).update(
+            checkpoint_id=ids[0]
+        )
+
+        messages = self.run_task()
+
+        self.assertEqual(len(messages), 1)
+        self.assertNotIn(f"Borrowing ID: {ids[0]}\n", messages[0])
+        self.assertEqual(messages[0].count("Overdue borrowing:"), 2)
+        scan.refresh_from_db()
+        self.assertIsNotNone(scan.finished_at)
+
+    def test_failed_digest_is_not_checkpointed(self):
+        self.create_overdue(2)
+        response = mock.Mock()
+        response.raise_for_status.side_effect = requests.HTTPError("502")
+
+        with mock.patch(
+            "borrowings.tasks.send_telegram_message", return_value=response
+        ):
+            with self.assertRaises(requests.HTTPError):
+                check_overdue_borrowings_task()
+
+        self.assertFalse(
+            Borrowing.objects.exclude(overdue_notified_for=None).exists()
+        )
+        partition = OverdueScanPartition.objects.get()
+        self.assertEqual((partition.rows, partition.messages), (0, 0))
+        self.assertIsNone(partition.finished_at)
+
+        messages = self.run_task()
+        self.assertEqual(messages[0].count("Overdue borrowing:"), 2)
+
+    def run_queued_partitions(self, mock_async_task):
+        """Run queued partitions the way one worker after another would"""
+        with mock.patch("borrowings.tasks.send_telegram_message") as mock_send:
+            while mock_async_task.call_args_list:
+                call = mock_async_task.call_args_list.pop(0)
+                scan_overdue_partition(*call.args[1:])
+
+        return [call.args[0] for call in mock_send.call_args_list]
+
+    @mock.patch("borrowings.tasks.OVERDUE_PARTITION_ROWS", 10)
+    @mock.patch("borrowings.tasks.async_task")
+    def test_large_backlog_is_partitioned(self, mock_async_task):
+        self.create_overdue(30)
+
+        self.assertEqual(len(self.run_task()), 1)
+
+        scan = OverdueScan.objects.get()
+        partitions = list(scan.partitions.order_by("start_id"))
+        self.assertEqual(len(partitions), 3)
+        self.assertEqual(
+            partitions[-1].end_id, Borrowing.objects.latest("id").id
+        )
+        # Partitions run one at a time so a single worker sends
+        self.assertEqual(mock_async_task.call_count, 1)
+
+        self.assertEqual(len(self.run_queued_partitions(mock_async_task)), 2)
+        self.assertEqual(
+            sum(p.rows for p in scan.partitions.all()),
+            30,
+        )
+        scan.refresh_from_db()
+        self.assertIsNotNone(scan.finished_at)
+
+    @mock.patch("borrowings.tasks.OVERDUE_CHUNK_SIZE", 2)
+    @mock.patch("borrowings.tasks.get_partition_message_budget")
+    @mock.patch("borrowings.tasks.async_task")
+    def test_run_stops_at_its_message_budget(
+        self, mock_async_task, mock_budget
+    ):
+        mock_budget.return_value = 1
+        self.create_overdue(5)
+        scan = start_overdue_scan(timezone.localdate())
+        partition = scan.partitions.get()
+
+        with mock.patch("borrowings.tasks.pack_digests") as mock_pack:
+            # One digest per borrowing
+            mock_pack.side_effect = lambda entries: (
+                (text, [key]) for key, text in entries
+            )
+            with mock.patch("borrowings.tasks.send_telegram_message"):
+                result = scan_overdue_partition(partition.id)
+
+            self.assertEqual(result["messages"], 1)
+            mock_async_task.assert_called_once_with(
+                "borrowings.tasks.scan_overdue_partition", partition.id
+            )
+            self.assertEqual(
+                len(self.run_queued_partitions(mock_async_task)), 4
+            )
+
+        partition.refresh_from_db()
+        self.assertEqual(partition.rows, 5)
+        self.assertIsNotNone(partition.finished_at)
+
+    def test_message_budget_fits_the_task_timeout(self):
+        self.assertEqual(get_partition_message_budget(), 30)
+
+    def test_no_overdue_borrowings(self):
+        self.assertEqual(self.run_task(), ["No new overdue borrowings today!"])
@@ -0,0 +1,71 @@
+from unittest.mock import Mock, patch
+
+import requests
+from django.test import SimpleTestCase
+
+from borrowings.telegram import TelegramClient, TokenBucket
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_burst_up_to_capacity_then_waits(self):
+        bucket = TokenBucket(rate=2, capacity=2)
+
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertAlmostEqual(bucket.reserve(), 0.5, places=2)
+        self.assertAlmostEqual(bucket.reserve(), 1.0, places=2)
+
+
+@patch("borrowings.telegram.time.sleep")
+@patch("requests.Session.post")
+class TelegramClientTests(SimpleTestCase):
+    def setUp(self):
+        self.client = TelegramClient(
+            "token", "chat", max_retries=2, backoff=1, chat_rate=100
+        )
+
+    def test_send_uses_timeout_and_payload(self, mock_post, mock_sleep):
+        mock_post.return_value = Mock(status_code=200)
+
+        response = self.client.send("Hello")
+
+        self.assertEqual(response.status_code, 200)
+        mock_post.assert_called_once_with(
+            "https://api.telegram.org/bottoken/sendMessage",
+            json={"chat_id": "chat", "text": "Hello"},
+            timeout=self.client.timeout,
+        )
+        mock_sleep.assert_not_called()
+
+    def test_retries_with_backoff(self, mock_post, mock_sleep):
+        mock_post.side_effect = [
+            requests.ConnectionError(),
+            Mock(status_code=502),
+            Mock(status_code=200),
+        ]
+
+        response = self.client.send("Hello")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [call.args[0] for call in mock_sleep.call_args_list], [1, 2]
+        )
+
+    def test_honours_retry_after(self, mock_post, mock_sleep):
+        throttled = Mock(status_code=429)
+        throttled.json.return_value = {"parameters": {"retry_after": 7}}
+        mock_post.side_effect = [throttled, Mock(status_code=200)]
+
+        self.client.send("Hello")
+
+        mock_sleep.assert_called_once_with(7)
+
+    def test_returns_last_response_when_retries_run_out(
+        self, mock_post, mock_sleep
+    ):
+        mock_post.return_value = Mock(status_code=503)
+
+        response = self.client.send("Hello")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(mock_post.call_count, 3)
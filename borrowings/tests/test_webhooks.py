@@ -0,0 +1,96 @@
+import json
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from books.models import Book
+from borrowings.accounts import record_payment
+from borrowings.models import AccountSummary, Borrowing, Payment, StripeEvent
+from borrowings.stripe_local import LocalStripe
+from users.models import User
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET="whsec_test")
+@mock.patch("borrowings.payment_service.queue_telegram_message")
+class StripeWebhookTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+        book = Book.objects.create(title="Book 1", inventory=2, dayle_fee=2)
+        borrowing = Borrowing.objects.create(
+            expected_return_date=date(2030, 5, 30), book=book, user=self.user
+        )
+        self.payment = Payment.objects.create(
+            borrowing=borrowing,
+            status=Payment.StatusChoices.PENDING,
+            type=Payment.TypeChoices.PAYMENT,
+            money_to_pay=Decimal("8"),
+            session_id="cs_test_1",
+        )
+        record_payment(self.payment)
+        self.stripe = LocalStripe()
+
+    def test_completed_checkout_marks_payment_paid_once(self, mock_queue):
+        event = self.stripe.checkout_completed("cs_test_1")
+
+        first = self.stripe.deliver(event)
+        second = self.stripe.deliver(event)
+
+        self.assertEqual(first.data, {"processed": True})
+        self.assertEqual(second.data, {"processed": False})
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.StatusChoices.PAID)
+        self.assertEqual(
+            AccountSummary.objects.get(pk=self.user.pk).pending_payments, 0
+        )
+        self.assertEqual(StripeEvent.objects.count(), 1)
+        mock_queue.assert_called_once()
+
+    def test_unpaid_session_is_recorded_but_ignored(self, mock_queue):
+        self.stripe.deliver(
+            self.stripe.checkout_completed("cs_test_1", "unpaid")
+        )
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.StatusChoices.PENDING)
+        self.assertEqual(StripeEvent.objects.count(), 1)
+
+    def test_bad_signature_is_rejected(self, mock_queue):
+        event = self.stripe.checkout_completed("cs_test_1")
+        forged = LocalStripe("whsec_other").sign(json.dumps(event))
+
+        response = self.stripe.deliver(event, signature=forged)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(StripeEvent.objects.exists())
+
+    def test_success_redirect_reads_local_state(self, mock_queue):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = reverse("borrowings:payment_success", args=[self.payment.id])
+        self.stripe.deliver(self.stripe.checkout_completed("cs_test_1"))
+
+        with mock.patch("stripe.checkout.Session.retrieve") as retrieve:
+            paid = client.get(url)
+
+        retrieve.assert_not_called()
+        self.assertEqual(paid.data, {"success": "Payment was successful."})
+
+    def test_webhook_url(self, mock_queue):
+        event = self.stripe.checkout_completed("cs_test_1")
+        payload = json.dumps(event)
+
+        response = APIClient().post(
+            reverse("borrowings:stripe_webhook"),
+            payload,
+            content_type="application/json",
+            HTTP_STRIPE_SIGNATURE=self.stripe.sign(payload),
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"processed": True})
@@ -1,13 +1,24 @@
 from django.urls import path, include
 from rest_framework import routers
 
-from borrowings.views import BorrowingViewSet, PaymentViewSet
+from borrowings.views import (
+    AnalyticsViewSet,
+    BorrowingViewSet,
+    PaymentViewSet,
+    StripeWebhookView,
+)
 
 router = routers.DefaultRouter()
 router.register("borrowings", BorrowingViewSet, basename="borrowing")
 router.register("payments", PaymentViewSet, basename="payment")
+router.register("analytics", AnalyticsViewSet, basename="analytics")
 
 urlpatterns = [
+    path(
+        "payments/webhook/",
+        StripeWebhookView.as_view(),
+        name="stripe_webhook",
+    ),
     path(
         "payments/<int:pk>/success/",
         PaymentViewSet.as_view({"get": "payment_success"}),
@@ -1,56 +1,181 @@
-import os
+from functools import cache
 
 import stripe
-from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import F, Prefetch, Sum
+from django.http import Http404
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from borrowings.models import Borrowing, Payment
-from borrowings.notification_service import send_telegram_message
+from borrowings.archive import (
+    attach_history_payments,
+    get_history_querysets,
+)
+from borrowings.exports import (
+    export_response,
+    EXPORT_FORMATS,
+    BORROWING_EXPORT_FIELDS,
+    PAYMENT_EXPORT_FIELDS,
+)
+from borrowings.gateway import (
+    GatewayError,
+    get_gateway_stats,
+    get_payment_gateway,
+)
+from borrowings.models import (
+    ArchivedBorrowing,
+    Borrowing,
+    DailyBookStats,
+    Payment,
+)
+from borrowings.payment_service import confirm_payment
+from borrowings.returns import return_borrowings
 from borrowings.serializers import (
+    AnalyticsRangeSerializer,
+    BulkReturnSerializer,
+    BulkReturnResultSerializer,
+    BorrowingCartSerializer,
+    BorrowingHistorySerializer,
     BorrowingSerializer,
     BorrowingListSerializer,
     BorrowingReturnSerializer,
+    DailyStatsSerializer,
+    FineTotalsSerializer,
     PaymentSerializer,
+    TopBookSerializer,
 )
+from borrowings.webhooks import construct_event, process_event
+from library_service.fastpath import ValuesListMixin, ValuesMapper
+from library_service.pagination import (
+    BorrowingHistoryPagination,
+    BorrowingPagination,
+)
+
+
+EXPORT_PARAMETERS = [
+    OpenApiParameter(
+        name="is_active",
+        description="Filter by active borrowings",
+        required=False,
+        type=OpenApiTypes.BOOL,
+    ),
+    OpenApiParameter(
+        name="user_id",
+        description="Filter by user ID",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+    OpenApiParameter(
+        name="file_format",
+        description="Export format",
+        required=False,
+        type=OpenApiTypes.STR,
+        enum=list(EXPORT_FORMATS),
+    ),
+]
+
+
+def filter_borrowings(queryset, request, prefix=""):
+    """Apply the ``is_active`` and staff-only ``user_id`` filters.
+
+    ``prefix`` points at the borrowing from a related model, e.g.
+    ``"borrowing__"`` for payments.
+    """
+    is_active = request.query_params.get("is_active")
+    user_id = request.query_params.get("user_id")
+
+    if is_active:
+        if is_active.lower() == "true":
+            queryset = queryset.filter(**{f"{prefix}actual_return_date": None})
+        else:
+            queryset = queryset.exclude(
+                **{f"{prefix}actual_return_date": None}
+            )
+
+    if request.user.is_staff and user_id:
+        queryset = queryset.filter(**{f"{prefix}user__id": user_id})
+
+    return queryset
+
 
+@cache
+def get_payment_mapper():
+    return ValuesMapper(PaymentSerializer())
 
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+
+def get_export_format(request):
+    file_format = request.query_params.get("file_format", "ndjson")
+
+    if file_format not in EXPORT_FORMATS:
+        raise ValidationError(
+            {"file_format": f"Choose one of: {', '.join(EXPORT_FORMATS)}."}
+        )
+
+    return file_format
 
 
 class BorrowingViewSet(
+    ValuesListMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.CreateModelMixin,
     viewsets.GenericViewSet,
 ):
-    queryset = Borrowing.objects.select_related("book", "user")
+    queryset = Borrowing.objects.select_related(
+        "book", "user"
+    ).prefetch_related(
+        Prefetch("payments", queryset=Payment.objects.order_by("id"))
+    )
     serializer_class = BorrowingSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = BorrowingPagination
+    query_budgets = {
+        "list": 3,
+        "retrieve": 3,
+        "create": 24,
+        "cart": 40,
+        "book_return": 12,
+        "bulk_return": 40,
+        "fines": 1,
+        "history": 4,
+    }
 
     def get_queryset(self):
-        queryset = self.queryset
-        is_active = self.request.query_params.get("is_active")
-        user_id = self.request.query_params.get("user_id")
-
-        if is_active:
-            if is_active.lower() == "true":
-                queryset = queryset.filter(actual_return_date=None)
-            else:
-                queryset = queryset.exclude(actual_return_date=None)
+        queryset = filter_borrowings(self.queryset, self.request)
 
         if self.request.user.is_staff:
-            if user_id:
-                queryset = queryset.filter(user__id=user_id)
-
             return queryset
 
         return queryset.filter(user=self.request.user)
 
+    def get_values_overrides(self):
+        return {"payments": ([], lambda row: row["payments"])}
+
+    def prepare_rows(self, rows, mapper):
+        if "payments" not in mapper.names:
+            return rows
+
+        payment_mapper = get_payment_mapper()
+        payments = {row["id"]: [] for row in rows}
+
+        for payment in (
+            Payment.objects.filter(borrowing_id__in=payments)
+            .order_by("id")
+            .values(*payment_mapper.lookups)
+        ):
+            payments[payment["borrowing"]].append(payment_mapper.map(payment))
+
+        for row in rows:
+            row["payments"] = payments[row["id"]]
+
+        return rows
+
     def get_serializer_class(self):
         if self.action in ["list", "retrieve"]:
             return BorrowingListSerializer
@@ -95,11 +220,126 @@ class BorrowingViewSet(
             status=status.HTTP_200_OK,
         )
 
+    @extend_schema(
+        request=BorrowingCartSerializer,
+        responses={201: BorrowingListSerializer(many=True)},
+    )
+    @action(methods=["POST"], detail=False, url_path="cart")
+    def cart(self, request):
+        """Borrow several books at once with a single checkout session"""
+        serializer = BorrowingCartSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        borrowings = serializer.save()
+
+        queryset = self.get_queryset().filter(
+            pk__in=[borrowing.pk for borrowing in borrowings]
+        )
+
+        return Response(
+            BorrowingListSerializer(
+                queryset.order_by("id"),
+                many=True,
+                context=self.get_serializer_context(),
+            ).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(
+        request=BulkReturnSerializer,
+        responses=BulkReturnResultSerializer(many=True),
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk-return",
+        permission_classes=[IsAdminUser],
+    )
+    def bulk_return(self, request):
+        """Return a batch of borrowings in one transaction"""
+        serializer = BulkReturnSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = return_borrowings(serializer.validated_data["ids"])
+
+        return Response(
+            BulkReturnResultSerializer(results, many=True).data,
+            status=status.HTTP_200_OK,
+        )
+
+    @extend_schema(
+        parameters=EXPORT_PARAMETERS[:2],
+        responses=FineTotalsSerializer,
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="fines",
+        permission_classes=[IsAdminUser],
+    )
+    def fines(self, request):
+        """Unpaid fines and fines accruing on overdue borrowings"""
+        totals = filter_borrowings(
+            Borrowing.objects.all(), request
+        ).fine_totals()
+
+        return Response(FineTotalsSerializer(totals).data)
 
-class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
+    @extend_schema(
+        parameters=EXPORT_PARAMETERS[:2],
+        responses=BorrowingHistorySerializer(many=True),
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="history",
+        permission_classes=[IsAdminUser],
+        pagination_class=BorrowingHistoryPagination,
+    )
+    def history(self, request):
+        """Current and archived borrowings with their payments"""
+        rows = self.paginate_queryset(
+            get_history_querysets(
+                filter_borrowings(Borrowing.objects.all(), request),
+                filter_borrowings(ArchivedBorrowing.objects.all(), request),
+            )
+        )
+
+        return self.get_paginated_response(
+            BorrowingHistorySerializer(
+                attach_history_payments(rows), many=True
+            ).data
+        )
+
+    @extend_schema(parameters=EXPORT_PARAMETERS)
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="export",
+        permission_classes=[IsAdminUser],
+    )
+    def export(self, request):
+        """Stream all matching borrowings as NDJSON or CSV"""
+        return export_response(
+            self.get_queryset(),
+            BORROWING_EXPORT_FIELDS,
+            get_export_format(request),
+            "borrowings",
+        )
+
+
+class PaymentViewSet(ValuesListMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {
+        "list": 2,
+        "retrieve": 2,
+        "payment_success": 13,
+        "gateway_stats": 1,
+        "payment_cancel": 1,
+    }
 
     def get_queryset(self):
         queryset = self.queryset
@@ -109,32 +349,81 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
 
         return queryset
 
+    @extend_schema(parameters=EXPORT_PARAMETERS)
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="export",
+        permission_classes=[IsAdminUser],
+    )
+    def export(self, request):
+        """Stream all matching payments as NDJSON or CSV"""
+        return export_response(
+            filter_borrowings(self.get_queryset(), request, "borrowing__"),
+            PAYMENT_EXPORT_FIELDS,
+            get_export_format(request),
+            "payments",
+        )
+
     @action(detail=True, methods=["GET"], url_path="success")
     def payment_success(self, request, pk=None):
-        """Handle a successful payment"""
-        payment = get_object_or_404(Payment, pk=pk)
-
-        session = stripe.checkout.Session.retrieve(payment.session_id)
-        if session.payment_status == "paid":
-            payment.status = Payment.StatusChoices.PAID
-            payment.save()
-
-            message = (
-                f"Payment #{payment.id} was successful.\n"
-                f"Type: {payment.type}\n"
-                f"Borrowing: {payment.borrowing}"
-            )
-            send_telegram_message(message)
+        """Report the payment state recorded by the Stripe webhook.
+
+        A payment still pending is checked with the gateway, whose cached
+        answer keeps page reloads from reaching Stripe each time.
+        """
+        payment = (
+            Payment.objects.filter(pk=pk)
+            .values("status", "session_id")
+            .first()
+        )
+
+        if payment is None:
+            raise Http404
 
+        if (
+            payment["status"] == Payment.StatusChoices.PENDING
+            and payment["session_id"]
+        ):
+            try:
+                session_status = get_payment_gateway().get_session_status(
+                    payment["session_id"]
+                )
+            except (GatewayError, stripe.error.StripeError):
+                session_status = None
+
+            if session_status == "paid":
+                # A cart shares one session across its payments
+                with transaction.atomic():
+                    for session_payment in Payment.objects.select_related(
+                        "borrowing__user", "borrowing__book"
+                    ).filter(
+                        session_id=payment["session_id"],
+                        status=Payment.StatusChoices.PENDING,
+                    ):
+                        confirm_payment(session_payment)
+                payment["status"] = Payment.StatusChoices.PAID
+
+        if payment["status"] == Payment.StatusChoices.PAID:
             return Response(
                 {"success": "Payment was successful."},
                 status=status.HTTP_200_OK,
             )
-        else:
-            return Response(
-                {"error": "Payment was not successful."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+
+        return Response(
+            {"message": "Payment is being confirmed."},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="gateway-stats",
+        permission_classes=[IsAdminUser],
+    )
+    def gateway_stats(self, request):
+        """Call, error, rejection and latency figures per gateway operation"""
+        return Response(get_gateway_stats())
 
     @action(detail=True, methods=["GET"], url_path="cancel")
     def payment_cancel(self, request, pk=None):
@@ -143,3 +432,118 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
             {"message": "Payment can be made later."},
             status=status.HTTP_200_OK,
         )
+
+
+ANALYTICS_PARAMETERS = [
+    OpenApiParameter(
+        name="start",
+        description="First day (defaults to 30 days before end)",
+        required=False,
+        type=OpenApiTypes.DATE,
+    ),
+    OpenApiParameter(
+        name="end",
+        description="Last day (defaults to yesterday)",
+        required=False,
+        type=OpenApiTypes.DATE,
+    ),
+]
+
+
+class AnalyticsViewSet(viewsets.GenericViewSet):
+    """Staff analytics served from the daily rollups only.
+
+    ``DailyBookStats`` is filled by ``update_daily_book_stats``, so these
+    endpoints never read borrowings or payments and cover finished days.
+    """
+
+    queryset = DailyBookStats.objects.all()
+    permission_classes = [IsAdminUser]
+    query_budgets = {"daily": 1, "top_books": 1}
+
+    def get_range(self):
+        serializer = AnalyticsRangeSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        return (
+            self.get_queryset().filter(
+                day__range=(data["start"], data["end"])
+            ),
+            data,
+        )
+
+    @extend_schema(
+        parameters=ANALYTICS_PARAMETERS,
+        responses=DailyStatsSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False, url_path="daily")
+    def daily(self, request):
+        """Library-wide borrows, returns, fines and revenue per day"""
+        queryset, _ = self.get_range()
+        days = (
+            queryset.values("day")
+            .annotate(
+                borrows=Sum("borrows"),
+                returns=Sum("returns"),
+                late_returns=Sum("late_returns"),
+                fines_issued=Sum("fines_issued"),
+                revenue=Sum("revenue"),
+            )
+            .order_by("day")
+        )
+
+        return Response(DailyStatsSerializer(days, many=True).data)
+
+    @extend_schema(
+        parameters=ANALYTICS_PARAMETERS
+        + [
+            OpenApiParameter(
+                name="limit",
+                description="Number of books (1-100, default 10)",
+                required=False,
+                type=OpenApiTypes.INT,
+            )
+        ],
+        responses=TopBookSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False, url_path="top-books")
+    def top_books(self, request):
+        """Most borrowed books over the range"""
+        queryset, data = self.get_range()
+        books = (
+            queryset.values("book", title=F("book__title"))
+            .annotate(
+                borrows=Sum("borrows"),
+                late_returns=Sum("late_returns"),
+                revenue=Sum("revenue"),
+            )
+            .order_by("-borrows", "book")[: data["limit"]]
+        )
+
+        return Response(TopBookSerializer(books, many=True).data)
+
+
+class StripeWebhookView(APIView):
+    """Receive signed Stripe events; duplicates are acknowledged and skipped"""
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_classes = []
+    query_budget = 16
+
+    @extend_schema(exclude=True)
+    def post(self, request):
+        try:
+            event = construct_event(
+                request.body, request.META.get("HTTP_STRIPE_SIGNATURE", "")
+            )
+        except (ValueError, stripe.error.SignatureVerificationError):
+            return Response(
+                {"error": "Invalid Stripe event."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        processed = process_event(event)
+
+        return Response({"processed": processed}, status=status.HTTP_200_OK)
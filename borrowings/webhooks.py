@@ -0,0 +1,54 @@
+import stripe
+from django.conf import settings
+from django.db import transaction
+
+from borrowings.models import Payment, StripeEvent
+from borrowings.payment_service import confirm_payment
+
+
+def construct_event(payload, signature):
+    """Verify the ``Stripe-Signature`` header and parse the event.
+
+    Raises ``ValueError`` or ``stripe.error.SignatureVerificationError``.
+    """
+    return stripe.Webhook.construct_event(
+        payload, signature, settings.STRIPE_WEBHOOK_SECRET
+    )
+
+
+def complete_checkout_session(session):
+    if session["payment_status"] != "paid":
+        return
+
+    payments = Payment.objects.filter(
+        session_id=session["id"], status=Payment.StatusChoices.PENDING
+    ).select_related("borrowing__user", "borrowing__book")
+
+    for payment in payments:
+        confirm_payment(payment)
+
+
+EVENT_HANDLERS = {
+    "checkout.session.completed": complete_checkout_session,
+    "checkout.session.async_payment_succeeded": complete_checkout_session,
+}
+
+
+@transaction.atomic
+def process_event(event):
+    """Handle ``event`` once; returns ``False`` for a duplicate delivery.
+
+    The event row and the payment updates commit together, so a retried
+    delivery after a failure is processed again instead of skipped.
+    """
+    _, created = StripeEvent.objects.get_or_create(
+        id=event["id"], defaults={"type": event["type"]}
+    )
+    if not created:
+        return False
+
+    handler = EVENT_HANDLERS.get(event["type"])
+    if handler is not None:
+        handler(event["data"]["object"])
+
+    return True
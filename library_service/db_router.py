@@ -0,0 +1,151 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import SimpleLazyObject, empty
+
+
+PINNED_KEY = "db:pinned:{}"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+replica_reads = ContextVar("replica_reads", default=None)
+
+
+def get_replica_alias():
+    """The configured replica alias, or ``None`` if there is none"""
+    alias = settings.DATABASE_REPLICA["ALIAS"]
+
+    return alias if alias in connections.settings else None
+
+
+def pin_to_primary(user_id):
+    """Send ``user_id``'s reads to the primary for the sticky window"""
+    cache.set(
+        PINNED_KEY.format(user_id),
+        True,
+        settings.DATABASE_REPLICA["STICKY_SECONDS"],
+    )
+
+
+def get_authenticated_user(request):
+    """``request.user`` once known, without forcing a lazy session lookup"""
+    user = getattr(request, "user", None)
+
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        return None
+    if user is None or not user.is_authenticated:
+        return None
+
+    return user
+
+
+class ReplicaReads:
+    """Reads of one request or job that may be served by the replica.
+
+    A request's reads stay on the primary while its user is pinned; the
+    user is checked once authentication has identified them.
+    """
+
+    def __init__(self, request=None):
+        self.request = request
+        self.pinned = None if request is not None else False
+
+    def is_pinned(self):
+        if self.pinned is None:
+            user = get_authenticated_user(self.request)
+            if user is None:
+                return False
+
+            self.pinned = bool(cache.get(PINNED_KEY.format(user.pk)))
+
+        return self.pinned
+
+
+@contextmanager
+def use_replica(request=None):
+    """Let reads inside the block go to the replica.
+
+    Usable as a decorator too; analytics jobs wrap their read phase in it.
+    """
+    token = replica_reads.set(ReplicaReads(request))
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Send reads inside the block to the primary, even within
+    ``use_replica``; for results that outlive the request, such as cached
+    responses.
+    """
+    token = replica_reads.set(None)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """Route reads to ``settings.DATABASE_REPLICA["ALIAS"]`` when allowed.
+
+    Only reads inside ``use_replica`` qualify, and never while the primary
+    is in a transaction, whose reads must see its own writes. Writes and
+    migrations always go to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        reads = replica_reads.get()
+        alias = get_replica_alias()
+
+        if (
+            reads is None
+            or alias is None
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+            or reads.is_pinned()
+        ):
+            return DEFAULT_DB_ALIAS
+
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != settings.DATABASE_REPLICA["ALIAS"]
+
+
+class ReplicaRoutingMiddleware:
+    """Serve safe-method requests from the replica.
+
+    After an authenticated user's write the user is pinned to the primary
+    for ``STICKY_SECONDS``, so they read their own changes. Disabled when
+    no replica database is configured.
+    """
+
+    def __init__(self, get_response):
+        if get_replica_alias() is None:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in SAFE_METHODS:
+            with use_replica(request):
+                return self.get_response(request)
+
+        response = self.get_response(request)
+
+        # DRF authenticates in the view and sets the user on the request
+        user = get_authenticated_user(request)
+        if user is not None:
+            pin_to_primary(user.pk)
+
+        return response
@@ -0,0 +1,148 @@
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from library_service.sparse_fields import SparseFieldsMixin
+
+
+class ValuesMapper:
+    """Build a serializer's output straight from ``.values()`` rows.
+
+    The serializer's fields are resolved once into ``(name, step)`` pairs
+    where each step reads one lookup and runs only the leaf field's
+    ``to_representation``. Model instances, ``get_attribute`` and nested
+    serializer calls are skipped while the output stays identical.
+
+    ``overrides`` maps a field name to ``(lookups, function(row))`` for
+    fields that cannot be derived automatically, such as
+    ``SerializerMethodField`` or ``many=True`` nested serializers.
+    """
+
+    def __init__(self, serializer, overrides=None, prefix=""):
+        overrides = overrides or {}
+        self.lookups = []
+        self.steps = []
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+
+            if name in overrides:
+                lookups, step = overrides[name]
+                self.lookups.extend(lookups)
+                self.steps.append((name, step))
+                continue
+
+            source = prefix + "__".join(field.source_attrs)
+
+            if isinstance(field, serializers.ListSerializer) or isinstance(
+                field, serializers.SerializerMethodField
+            ):
+                raise ValueError(f"Field '{name}' needs an override")
+
+            if isinstance(field, serializers.BaseSerializer):
+                nested = ValuesMapper(field, prefix=f"{source}__")
+                self.lookups.extend(nested.lookups)
+                self.steps.append((name, nested.map))
+                continue
+
+            if isinstance(
+                field, (serializers.RelatedField, serializers.ReadOnlyField)
+            ):
+                convert = None
+            else:
+                convert = field.to_representation
+
+            self.lookups.append(source)
+            self.steps.append((name, self.compile_step(source, convert)))
+
+    @staticmethod
+    def compile_step(lookup, convert):
+        if convert is None:
+            return lambda row: row[lookup]
+
+        def step(row):
+            value = row[lookup]
+            return None if value is None else convert(value)
+
+        return step
+
+    @property
+    def names(self):
+        return [name for name, _ in self.steps]
+
+    def map(self, row):
+        return {name: step(row) for name, step in self.steps}
+
+
+class ValuesListMixin(SparseFieldsMixin):
+    """Serve ``list`` from ``.values()`` rows through a ``ValuesMapper``"""
+
+    values_mappers = {}
+
+    def get_values_overrides(self):
+        return {}
+
+    def build_values_mapper(self, serializer_class, selection=None):
+        key = (type(self), serializer_class, selection)
+
+        if key not in self.values_mappers:
+            serializer = serializer_class()
+            if selection is not None:
+                serializer = self.select_fields(serializer, selection)
+            self.values_mappers[key] = ValuesMapper(
+                serializer, self.get_values_overrides()
+            )
+
+        return self.values_mappers[key]
+
+    def get_values_mapper(self):
+        serializer_class = self.get_serializer_class()
+        mapper = self.build_values_mapper(serializer_class)
+        selection = self.get_field_selection()
+
+        if selection is None:
+            return mapper
+
+        # Key on the names actually kept, so unknown names in the query
+        # cannot grow the cache
+        fields, exclude = selection
+        names = frozenset(
+            name
+            for name in mapper.names
+            if (fields is None or name in fields) and name not in exclude
+        )
+        if len(names) == len(mapper.names):
+            return mapper
+
+        return self.build_values_mapper(serializer_class, (names, frozenset()))
+
+    def get_field_lookups(self):
+        if self.get_field_selection() is None:
+            return None
+
+        return self.get_values_mapper().lookups
+
+    def get_paging_lookups(self):
+        """Fields the paginator reads from rows to build its cursor"""
+        orderings = getattr(self.paginator, "orderings", {})
+
+        return {field for ordering in orderings.values() for field in ordering}
+
+    def prepare_rows(self, rows, mapper):
+        """Hook to attach data for overridden fields to a page of rows"""
+        return rows
+
+    def list(self, request, *args, **kwargs):
+        mapper = self.get_values_mapper()
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            "id", *mapper.lookups, *self.get_paging_lookups()
+        )
+
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else list(queryset)
+        data = [mapper.map(row) for row in self.prepare_rows(rows, mapper)]
+
+        if page is not None:
+            return self.get_paginated_response(data)
+
+        return Response(data)
@@ -0,0 +1,203 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Forward-only cursor pagination that seeks on a unique key tuple.
+
+    Every page is fetched with ``WHERE (key) > (last seen key)`` instead of
+    ``OFFSET``, so page N costs the same as page 1. The last field of each
+    ordering must be unique (normally ``id``).
+    """
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering_query_param = "ordering"
+    orderings = {"id": ("id",)}
+    default_ordering = "id"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering_name = self.get_ordering_name(request)
+        self.ordering = self.orderings[self.ordering_name]
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        self.position = self.decode_cursor(encoded) if encoded else None
+
+        results = self.fetch_page(queryset)
+        self.has_next = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        return self.page
+
+    def fetch_page(self, queryset):
+        """Up to one item more than a page, starting after the cursor"""
+        queryset = queryset.order_by(*self.ordering)
+
+        if self.position is not None:
+            position = self.get_seek_position(queryset.model)
+            queryset = queryset.filter(self.get_seek_filter(position))
+
+        return list(queryset[: self.page_size + 1])
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_ordering_name(self, request):
+        ordering_name = request.query_params.get(self.ordering_query_param)
+
+        if ordering_name in self.orderings:
+            return ordering_name
+
+        return self.default_ordering
+
+    def get_seek_position(self, model):
+        """The cursor position converted to ``model``'s ordering fields"""
+        try:
+            position = [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.ordering, self.position)
+            ]
+        except (ValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+
+        return position
+
+    def get_seek_filter(self, position):
+        """Build ``(a, b) > (x, y)`` as ``a > x OR (a = x AND b > y)``"""
+        seek_filter = Q()
+        equal_prefix = {}
+
+        for field, value in zip(self.ordering, position):
+            seek_filter |= Q(**equal_prefix, **{f"{field}__gt": value})
+            equal_prefix[field] = value
+
+        return seek_filter
+
+    def get_position(self, item):
+        return [
+            getattr(item, field) if not isinstance(item, dict) else item[field]
+            for field in self.ordering
+        ]
+
+    def encode_cursor(self, position):
+        payload = json.dumps(
+            {"o": self.ordering_name, "p": position},
+            default=str,
+            separators=(",", ":"),
+        )
+        return urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, encoded):
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode()))
+            ordering_name, position = payload["o"], payload["p"]
+        except (BinasciiError, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if ordering_name != self.ordering_name or not (
+            isinstance(position, list) and len(position) == len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        url = self.request.build_absolute_uri()
+        cursor = self.encode_cursor(self.get_position(self.page[-1]))
+
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.ordering_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Result ordering.",
+                "schema": {"type": "string", "enum": list(self.orderings)},
+            },
+        ]
+
+
+class BorrowingPagination(KeysetPagination):
+    orderings = {
+        "id": ("id",),
+        "expected_return_date": ("expected_return_date", "id"),
+    }
+
+
+class MergedKeysetPagination(KeysetPagination):
+    """Keyset pagination over several querysets read as one stream.
+
+    ``paginate_queryset`` takes a list of querysets; each is seeked and
+    limited on its own and the pages are merged, so a page costs one
+    query per queryset. The key must be unique across all of them.
+    """
+
+    def fetch_page(self, querysets):
+        results = []
+        for queryset in querysets:
+            results.extend(super().fetch_page(queryset))
+
+        return sorted(results, key=self.get_position)[: self.page_size + 1]
+
+
+class BorrowingHistoryPagination(MergedKeysetPagination):
+    orderings = BorrowingPagination.orderings
@@ -0,0 +1,112 @@
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def get_query_budget(view_func, method):
+    """Return the budget a view declares for ``method``, or ``None``.
+
+    Viewsets declare ``query_budgets = {"list": 3, ...}`` keyed by action
+    name; other views may set ``query_budget`` for every method.
+    """
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        return None
+
+    actions = getattr(view_func, "actions", None) or {}
+    action = actions.get(method.lower())
+    budgets = getattr(view_class, "query_budgets", {})
+
+    if action in budgets:
+        return budgets[action]
+
+    return getattr(view_class, "query_budget", None)
+
+
+class QueryCounter:
+    """``execute_wrapper`` callable counting the queries it lets through"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMiddleware:
+    """Check every request against its view's query budget.
+
+    Enabled by ``QUERY_BUDGET_MODE``: ``"warn"`` logs overruns and
+    ``"raise"`` turns them into errors. Responses carry the query count
+    in ``X-Query-Count``. Meant for staging; tests use
+    ``QueryBudgetTestMixin`` instead.
+    """
+
+    def __init__(self, get_response):
+        self.mode = getattr(settings, "QUERY_BUDGET_MODE", None)
+        if self.mode not in ("warn", "raise"):
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+
+        response["X-Query-Count"] = counter.count
+        budget = getattr(request, "query_budget", None)
+
+        if budget is not None and counter.count > budget:
+            message = (
+                f"{request.method} {request.path} ran {counter.count} "
+                f"queries, budget is {budget}"
+            )
+            if self.mode == "raise":
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_query_budget(view_func, request.method)
+
+
+class QueryBudgetTestMixin:
+    """``TestCase`` helpers asserting endpoints stay within budget"""
+
+    def assert_within_query_budget(self, method, url, *args, **kwargs):
+        match = resolve(url.split("?")[0])
+        budget = get_query_budget(match.func, method)
+        self.assertIsNotNone(
+            budget, f"{method.upper()} {url} declares no query budget"
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method.lower())(
+                url, *args, **kwargs
+            )
+
+        self.assertLessEqual(
+            len(queries),
+            budget,
+            "\n".join(
+                [f"{method.upper()} {url} is over its query budget:"]
+                + [query["sql"] for query in queries.captured_queries]
+            ),
+        )
+
+        return response
@@ -55,6 +55,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "library_service.query_budget.QueryBudgetMiddleware",
+    "library_service.db_router.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -67,6 +69,9 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "library_service.urls"
 
+# "warn" or "raise" checks every request against its view's query budget
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE")
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -96,6 +101,38 @@ DATABASES = {
     }
 }
 
+DATABASE_REPLICA = {
+    "ALIAS": "replica",
+    # Reads stay on the primary this long after a user's write
+    "STICKY_SECONDS": int(os.getenv("REPLICA_STICKY_SECONDS", 5)),
+}
+
+if os.getenv("REPLICA_DB_NAME"):
+    DATABASES[DATABASE_REPLICA["ALIAS"]] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / os.getenv("REPLICA_DB_NAME"),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["library_service.db_router.ReplicaRouter"]
+
+# Catalog versions, read-your-writes pins and payment gateway stats must be
+# shared by every web and django_q process, so deployments set
+# REDIS_CACHE_URL. Without it each process keeps its own cache, which only
+# suits a single-process development server and the test suite.
+CACHES = {
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_CACHE_URL"),
+        }
+        if os.getenv("REDIS_CACHE_URL")
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    )
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -150,6 +187,8 @@ REST_FRAMEWORK = {
         "rest_framework.throttling.UserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {"anon": "50/minute", "user": "100/minute"},
+    "DEFAULT_PAGINATION_CLASS": "library_service.pagination.KeysetPagination",
+    "PAGE_SIZE": int(os.getenv("API_PAGE_SIZE", 50)),
 }
 
 SPECTACULAR_SETTINGS = {
@@ -192,3 +231,37 @@ Q_CLUSTER = {
         "db": 0,
     },
 }
+
+STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
+STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
+STRIPE_TIMEOUT = 10
+STRIPE_MAX_NETWORK_RETRIES = 1
+
+# Set CLASS to "borrowings.gateway.FakeGateway" for load tests
+PAYMENT_GATEWAY = {
+    "CLASS": os.getenv(
+        "PAYMENT_GATEWAY_CLASS", "borrowings.gateway.StripeGateway"
+    ),
+    "FAILURE_THRESHOLD": 5,
+    "RESET_TIMEOUT": 30,
+    "STATUS_TTL": 30,
+}
+
+ARCHIVE = {
+    # Returned, fully paid borrowings older than this move to the archive
+    "AFTER_DAYS": int(os.getenv("ARCHIVE_AFTER_DAYS", 365)),
+    "CHUNK_SIZE": 500,
+}
+
+TELEGRAM = {
+    "BOT_TOKEN": os.getenv("TELEGRAM_BOT_TOKEN"),
+    "CHAT_ID": os.getenv("TELEGRAM_CHAT_ID"),
+    "TIMEOUT": (3.05, 10),
+    "MAX_RETRIES": 3,
+    "BACKOFF": 0.5,
+    "POOL_SIZE": 10,
+    # Telegram allows about 30 messages per second overall and one per
+    # second to the same chat.
+    "GLOBAL_RATE": 30,
+    "CHAT_RATE": 1,
+}
@@ -0,0 +1,89 @@
+from rest_framework import serializers
+
+
+def narrow_queryset(queryset, lookups, fields=()):
+    """Load only ``lookups``, joining just the relations they traverse.
+
+    Prefetches are kept only for relations named in ``fields``.
+    """
+    relations = {
+        lookup.rsplit("__", 1)[0] for lookup in lookups if "__" in lookup
+    }
+    prefetches = [
+        prefetch
+        for prefetch in queryset._prefetch_related_lookups
+        if getattr(prefetch, "prefetch_to", prefetch).split("__")[0] in fields
+    ]
+
+    return (
+        queryset.select_related(None)
+        .select_related(*relations)
+        .prefetch_related(None)
+        .prefetch_related(*prefetches)
+        .only(*lookups)
+    )
+
+
+class SparseFieldsMixin:
+    """Let clients pick response fields with ``?fields=`` / ``?exclude=``.
+
+    Both take comma-separated top-level field names; ``exclude`` is applied
+    after ``fields``. Unknown names are ignored.
+    """
+
+    fields_query_param = "fields"
+    exclude_query_param = "exclude"
+    sparse_actions = ("list", "retrieve")
+
+    def get_field_selection(self):
+        """Return ``(fields, exclude)`` from the query, or ``None``"""
+        if self.action not in self.sparse_actions:
+            return None
+
+        params = self.request.query_params
+        fields = params.get(self.fields_query_param)
+        exclude = params.get(self.exclude_query_param)
+
+        if not fields and not exclude:
+            return None
+
+        return (
+            frozenset(filter(None, fields.split(","))) if fields else None,
+            frozenset(filter(None, (exclude or "").split(","))),
+        )
+
+    def select_fields(self, serializer, selection=None):
+        selection = selection or self.get_field_selection()
+        if selection is None:
+            return serializer
+
+        fields, exclude = selection
+        target = serializer
+        if isinstance(serializer, serializers.ListSerializer):
+            target = serializer.child
+
+        for name in list(target.fields):
+            if (fields is not None and name not in fields) or name in exclude:
+                target.fields.pop(name)
+
+        return serializer
+
+    def get_serializer(self, *args, **kwargs):
+        return self.select_fields(super().get_serializer(*args, **kwargs))
+
+    def get_field_lookups(self):
+        """ORM lookups needed by the selected fields, or ``None`` for all"""
+        return None
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+
+        if self.action == "retrieve":
+            lookups = self.get_field_lookups()
+            if lookups is not None:
+                fields = self.select_fields(self.get_serializer_class()())
+                queryset = narrow_queryset(
+                    queryset, ["id", *lookups], fields.fields
+                )
+
+        return queryset